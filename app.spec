@@ -3,7 +3,7 @@
 
 a = Analysis(
     ['gui\\app.py'],
-    pathex=[],
+    pathex=['.'],
     binaries=[],
     datas=[],
     hiddenimports=[],
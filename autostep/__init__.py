@@ -0,0 +1 @@
+"""Shared recording and playback engine used by the CLI and GUI front ends."""
@@ -0,0 +1,5 @@
+import sys
+
+from autostep.cli import main
+
+sys.exit(main())
@@ -0,0 +1,348 @@
+"""Input-injection backends.
+
+Every backend resolves recorded button/key names to whatever its injector
+expects (``None`` when it cannot produce them) and exposes one handler per plan
+op, so a compiled plan is replayed with ``handlers[op](a, b)``.
+
+Run ``python -m autostep.backends [name ...]`` to measure events/s per backend.
+"""
+import sys
+import time
+
+from autostep.plan import MOVE, BUTTON_DOWN, BUTTON_UP, KEY_DOWN, KEY_UP
+
+DEFAULT_BACKEND = 'pynput'
+
+# pynput Key names that pyautogui spells differently.
+PYAUTOGUI_KEY_ALIASES = {
+    'alt_l': 'altleft',
+    'alt_r': 'altright',
+    'alt_gr': 'altright',
+    'caps_lock': 'capslock',
+    'cmd': 'win',
+    'cmd_l': 'winleft',
+    'cmd_r': 'winright',
+    'ctrl_l': 'ctrlleft',
+    'ctrl_r': 'ctrlright',
+    'shift_l': 'shiftleft',
+    'shift_r': 'shiftright',
+    'page_down': 'pagedown',
+    'page_up': 'pageup',
+    'num_lock': 'numlock',
+    'print_screen': 'printscreen',
+    'scroll_lock': 'scrolllock',
+    'media_play_pause': 'playpause',
+    'media_volume_mute': 'volumemute',
+    'media_volume_down': 'volumedown',
+    'media_volume_up': 'volumeup',
+    'media_previous': 'prevtrack',
+    'media_next': 'nexttrack',
+}
+
+# pynput Key names mapped to X11 keysym names.
+X11_KEYSYMS = {
+    'alt': 'Alt_L',
+    'alt_l': 'Alt_L',
+    'alt_r': 'Alt_R',
+    'alt_gr': 'ISO_Level3_Shift',
+    'backspace': 'BackSpace',
+    'caps_lock': 'Caps_Lock',
+    'cmd': 'Super_L',
+    'cmd_l': 'Super_L',
+    'cmd_r': 'Super_R',
+    'ctrl': 'Control_L',
+    'ctrl_l': 'Control_L',
+    'ctrl_r': 'Control_R',
+    'delete': 'Delete',
+    'down': 'Down',
+    'end': 'End',
+    'enter': 'Return',
+    'esc': 'Escape',
+    'home': 'Home',
+    'insert': 'Insert',
+    'left': 'Left',
+    'menu': 'Menu',
+    'num_lock': 'Num_Lock',
+    'page_down': 'Next',
+    'page_up': 'Prior',
+    'pause': 'Pause',
+    'print_screen': 'Print',
+    'right': 'Right',
+    'scroll_lock': 'Scroll_Lock',
+    'shift': 'Shift_L',
+    'shift_l': 'Shift_L',
+    'shift_r': 'Shift_R',
+    'space': 'space',
+    'tab': 'Tab',
+    'up': 'Up',
+}
+X11_KEYSYMS.update({f'f{n}': f'F{n}' for n in range(1, 21)})
+
+X11_BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+
+
+def parse_vk(name):
+    """Return the virtual key code of a pynput ``'<65>'`` key string, else None."""
+    if name.startswith('<') and name.endswith('>') and name[1:-1].isdigit():
+        return int(name[1:-1])
+    return None
+
+
+class Backend:
+    name = None
+
+    def resolve_button(self, name):
+        raise NotImplementedError
+
+    def resolve_key(self, name):
+        raise NotImplementedError
+
+    def move(self, x, y):
+        raise NotImplementedError
+
+    def button_down(self, button, _=None):
+        raise NotImplementedError
+
+    def button_up(self, button, _=None):
+        raise NotImplementedError
+
+    def key_down(self, key, _=None):
+        raise NotImplementedError
+
+    def key_up(self, key, _=None):
+        raise NotImplementedError
+
+    def handlers(self):
+        handlers = [None] * 5
+        handlers[MOVE] = self.move
+        handlers[BUTTON_DOWN] = self.button_down
+        handlers[BUTTON_UP] = self.button_up
+        handlers[KEY_DOWN] = self.key_down
+        handlers[KEY_UP] = self.key_up
+        return tuple(handlers)
+
+    def close(self):
+        pass
+
+
+class PynputBackend(Backend):
+    name = 'pynput'
+
+    def __init__(self):
+        from pynput.mouse import Button, Controller as MouseController
+        from pynput.keyboard import Key, KeyCode, Controller as KeyboardController
+        self._button_type = Button
+        self._key_type = Key
+        self._keycode_type = KeyCode
+        self.mouse = MouseController()
+        self.keyboard = KeyboardController()
+
+    def resolve_button(self, name):
+        if not name:
+            return None
+        return getattr(self._button_type, name, None)
+
+    def resolve_key(self, name):
+        if not name:
+            return None
+        if len(name) == 1:
+            return name
+        if name.startswith('Key.'):
+            return getattr(self._key_type, name[4:], None)
+        vk = parse_vk(name)
+        return self._keycode_type.from_vk(vk) if vk is not None else None
+
+    def move(self, x, y):
+        self.mouse.position = (x, y)
+
+    def button_down(self, button, _=None):
+        self.mouse.press(button)
+
+    def button_up(self, button, _=None):
+        self.mouse.release(button)
+
+    def key_down(self, key, _=None):
+        self.keyboard.press(key)
+
+    def key_up(self, key, _=None):
+        self.keyboard.release(key)
+
+
+class PyAutoGUIBackend(Backend):
+    """pyautogui with its per-call ``PAUSE`` sleep and failsafe corner check off."""
+    name = 'pyautogui'
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+        self._saved = (pyautogui.PAUSE, pyautogui.FAILSAFE)
+        pyautogui.PAUSE = 0
+        pyautogui.FAILSAFE = False
+        self._valid_keys = set(pyautogui.KEYBOARD_KEYS)
+
+    def resolve_button(self, name):
+        return name if name in ('left', 'middle', 'right') else None
+
+    def resolve_key(self, name):
+        if not name:
+            return None
+        if len(name) == 1:
+            return name
+        key = name.replace('Key.', '').lower()
+        key = PYAUTOGUI_KEY_ALIASES.get(key, key)
+        return key if key in self._valid_keys else None
+
+    def move(self, x, y):
+        self.pyautogui.moveTo(x, y, _pause=False)
+
+    def button_down(self, button, _=None):
+        self.pyautogui.mouseDown(button=button, _pause=False)
+
+    def button_up(self, button, _=None):
+        self.pyautogui.mouseUp(button=button, _pause=False)
+
+    def key_down(self, key, _=None):
+        self.pyautogui.keyDown(key, _pause=False)
+
+    def key_up(self, key, _=None):
+        self.pyautogui.keyUp(key, _pause=False)
+
+    def close(self):
+        self.pyautogui.PAUSE, self.pyautogui.FAILSAFE = self._saved
+
+
+class XTestBackend(Backend):
+    """Direct XTEST requests over python-xlib (X11 only), flushed per event."""
+    name = 'xtest'
+
+    def __init__(self):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self.X = X
+        self.XK = XK
+        self.fake_input = xtest.fake_input
+        self.display = display.Display()
+        if not self.display.has_extension('XTEST'):
+            self.display.close()
+            raise RuntimeError("X server does not support the XTEST extension")
+
+    def resolve_button(self, name):
+        return X11_BUTTONS.get(name)
+
+    def _keycode(self, keysym):
+        return self.display.keysym_to_keycode(keysym) or None
+
+    def resolve_key(self, name):
+        if not name:
+            return None
+        if len(name) == 1:
+            code = ord(name)
+            # Latin-1 keysyms equal their code point; the rest use the Unicode range.
+            return self._keycode(code if code < 0x100 else 0x01000000 | code)
+        if name.startswith('Key.'):
+            keysym_name = X11_KEYSYMS.get(name[4:])
+            if keysym_name is None:
+                return None
+            return self._keycode(self.XK.string_to_keysym(keysym_name))
+        vk = parse_vk(name)
+        return self._keycode(vk) if vk is not None else None
+
+    def move(self, x, y):
+        self.fake_input(self.display, self.X.MotionNotify, x=x, y=y)
+        self.display.flush()
+
+    def button_down(self, button, _=None):
+        self.fake_input(self.display, self.X.ButtonPress, button)
+        self.display.flush()
+
+    def button_up(self, button, _=None):
+        self.fake_input(self.display, self.X.ButtonRelease, button)
+        self.display.flush()
+
+    def key_down(self, key, _=None):
+        self.fake_input(self.display, self.X.KeyPress, key)
+        self.display.flush()
+
+    def key_up(self, key, _=None):
+        self.fake_input(self.display, self.X.KeyRelease, key)
+        self.display.flush()
+
+    def close(self):
+        self.display.close()
+
+
+class NullBackend(Backend):
+    """Accepts everything and injects nothing; measures engine overhead only."""
+    name = 'null'
+
+    def resolve_button(self, name):
+        return name or None
+
+    def resolve_key(self, name):
+        return name or None
+
+    def move(self, x, y):
+        pass
+
+    def button_down(self, button, _=None):
+        pass
+
+    def button_up(self, button, _=None):
+        pass
+
+    def key_down(self, key, _=None):
+        pass
+
+    def key_up(self, key, _=None):
+        pass
+
+
+class RecordingBackend(NullBackend):
+    """Null backend that keeps every injected ``(op, a, b)`` in ``calls``."""
+    name = 'recording'
+
+    def __init__(self):
+        self.calls = []
+
+    def handlers(self):
+        append = self.calls.append
+        return tuple((lambda a, b, op=op: append((op, a, b)))
+                     for op in (MOVE, BUTTON_DOWN, BUTTON_UP, KEY_DOWN, KEY_UP))
+
+
+BACKENDS = {
+    cls.name: cls
+    for cls in (PynputBackend, PyAutoGUIBackend, XTestBackend, NullBackend, RecordingBackend)
+}
+
+
+def get_backend(name=None):
+    name = name or DEFAULT_BACKEND
+    try:
+        cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return cls()
+
+
+def benchmark(backend, count=5000):
+    """Inject ``count`` alternating moves as fast as possible; return events/s."""
+    move = backend.handlers()[MOVE]
+    start = time.perf_counter()
+    for i in range(count):
+        move(100 + (i & 1), 100)
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed > 0 else float('inf')
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or list(BACKENDS):
+        try:
+            backend = get_backend(name)
+        except Exception as e:
+            print(f"{name:10} unavailable: {e}")
+            continue
+        try:
+            print(f"{name:10} {benchmark(backend):12.0f} events/s")
+        finally:
+            backend.close()
@@ -0,0 +1,224 @@
+"""Compact binary recording format (``.asr``).
+
+Layout, all little-endian::
+
+    header   32 bytes   magic b'ASTR', version u16, header size u16,
+                        screen width u32, screen height u32,
+                        event count u64, string table offset u64
+    records  32 bytes each: time f64, nx f64, ny f64, name id i32,
+                        type u8, flags u8, 2 pad bytes
+    strings  u32 count, then (u16 length, utf-8 bytes) per key/button name
+    meta     u32 length, then a JSON object with any other top-level fields
+
+``flags`` bit 0 is the click ``pressed`` state, bit 1 marks legacy absolute
+``x``/``y`` coordinates stored in the ``nx``/``ny`` slots. A name id of -1
+stands for a missing name (old recordings have ``"key": null`` where pynput
+gave no character). Files are read
+through ``mmap`` and iterated as plain tuples, so nothing is decoded until it
+is needed; ``to_dict()`` and ``write_binary()`` convert losslessly to and from
+the JSON representation.
+
+Convert from the command line with
+``python -m autostep.binfmt (to-bin|to-json) SRC DST``.
+"""
+import json
+import mmap
+import struct
+import sys
+
+from autostep.capture import MOUSE_MOVE, MOUSE_CLICK, EVENT_TYPES
+
+MAGIC = b'ASTR'
+VERSION = 1
+EXTENSION = '.asr'
+
+HEADER = struct.Struct('<4sHHIIQQ')
+RECORD = struct.Struct('<dddiBB2x')
+U16 = struct.Struct('<H')
+U32 = struct.Struct('<I')
+
+FLAG_PRESSED = 1
+FLAG_ABSOLUTE = 2
+
+_TYPE_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+_HEADER_FIELDS = ('screen_width', 'screen_height', 'events')
+
+
+def is_binary(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class BinaryRecording:
+    """Memory-mapped ``.asr`` file with dict-style access to its header fields."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, header_size, self.screen_width, self.screen_height,
+         self.count, strings_offset) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an AutoStep binary recording")
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"{path} uses binary format v{version}; this build reads up to v{VERSION}")
+        self.version = version
+        self.records_offset = header_size
+
+        pos = strings_offset
+        (n,) = U32.unpack_from(self._map, pos)
+        pos += U32.size
+        self.names = []
+        for _ in range(n):
+            (length,) = U16.unpack_from(self._map, pos)
+            pos += U16.size
+            self.names.append(self._map[pos:pos + length].decode('utf-8'))
+            pos += length
+        (meta_len,) = U32.unpack_from(self._map, pos)
+        pos += U32.size
+        self.meta = json.loads(self._map[pos:pos + meta_len]) if meta_len else {}
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def raw(self):
+        """Return a memoryview over the packed records; release it when done."""
+        start = self.records_offset
+        return memoryview(self._map)[start:start + self.count * RECORD.size]
+
+    def records(self):
+        """Yield raw ``(time, nx, ny, name_id, type, flags)`` tuples."""
+        view = self.raw()
+        try:
+            yield from RECORD.iter_unpack(view)
+        finally:
+            view.release()
+
+    def events(self):
+        names = self.names
+        for t, nx, ny, code, etype, flags in self.records():
+            event = {'type': EVENT_TYPES[etype], 'time': t}
+            if etype == MOUSE_MOVE or etype == MOUSE_CLICK:
+                if flags & FLAG_ABSOLUTE:
+                    event['x'] = int(nx)
+                    event['y'] = int(ny)
+                else:
+                    event['nx'] = nx
+                    event['ny'] = ny
+                if etype == MOUSE_CLICK:
+                    event['button'] = names[code] if code >= 0 else None
+                    event['pressed'] = bool(flags & FLAG_PRESSED)
+            else:
+                event['key'] = names[code] if code >= 0 else None
+            yield event
+
+    def get(self, key, default=None):
+        if key == 'screen_width':
+            return self.screen_width or None
+        if key == 'screen_height':
+            return self.screen_height or None
+        if key == 'events':
+            return self.events()
+        return self.meta.get(key, default)
+
+    def to_dict(self):
+        data = {}
+        if self.screen_width or self.screen_height:
+            data['screen_width'] = self.screen_width
+            data['screen_height'] = self.screen_height
+        data.update(self.meta)
+        data['events'] = list(self.events())
+        return data
+
+
+def write_binary(path, data):
+    """Write a JSON-style recording (dict or bare event list) as ``.asr``."""
+    if isinstance(data, BinaryRecording):
+        data = data.to_dict()
+    elif isinstance(data, list):
+        data = {'events': data}
+    events = data.get('events', [])
+    names = []
+    ids = {}
+    records = bytearray(RECORD.size * len(events))
+    pack_into = RECORD.pack_into
+
+    for i, event in enumerate(events):
+        etype = _TYPE_CODES.get(event['type'])
+        if etype is None:
+            raise ValueError(f"Unsupported event type {event['type']!r}")
+        flags = 0
+        nx = ny = 0.0
+        name = None
+        if etype == MOUSE_MOVE or etype == MOUSE_CLICK:
+            if 'nx' in event:
+                nx, ny = event['nx'], event['ny']
+            else:
+                nx, ny = event['x'], event['y']
+                flags |= FLAG_ABSOLUTE
+            if etype == MOUSE_CLICK:
+                name = event['button']
+                if event['pressed']:
+                    flags |= FLAG_PRESSED
+        else:
+            name = event['key']
+        code = -1  # no name
+        if name is not None:
+            code = ids.get(name)
+            if code is None:
+                code = ids[name] = len(names)
+                names.append(name)
+        pack_into(records, i * RECORD.size, event['time'], nx, ny, code, etype, flags)
+
+    meta = {k: v for k, v in data.items() if k not in _HEADER_FIELDS}
+    write_sections(path, data.get('screen_width'), data.get('screen_height'),
+                   len(events), records, names, meta)
+
+
+def write_sections(path, screen_width, screen_height, count, records, names, meta):
+    """Write an ``.asr`` file from already packed ``records``."""
+    strings = bytearray(U32.pack(len(names)))
+    for name in names:
+        encoded = name.encode('utf-8')
+        strings += U16.pack(len(encoded)) + encoded
+    meta_bytes = json.dumps(meta).encode('utf-8') if meta else b''
+    strings += U32.pack(len(meta_bytes)) + meta_bytes
+
+    header = HEADER.pack(MAGIC, VERSION, HEADER.size, screen_width or 0, screen_height or 0,
+                         count, HEADER.size + count * RECORD.size)
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(records)
+        f.write(strings)
+
+
+def export_json(src, dst):
+    with BinaryRecording(src) as rec:
+        data = rec.to_dict()
+    with open(dst, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ('to-bin', 'to-json'):
+        sys.exit("usage: python -m autostep.binfmt (to-bin|to-json) SRC DST")
+    command, src, dst = sys.argv[1:]
+    if command == 'to-bin':
+        from autostep.recording import read_recording
+        write_binary(dst, read_recording(src))
+    else:
+        export_json(src, dst)
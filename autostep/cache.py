@@ -0,0 +1,159 @@
+"""In-process LRU cache of decoded recordings.
+
+Entries are ``EventTrack`` objects keyed by absolute path and validated
+against the file's ``(mtime, size)`` on every lookup, so an edited or replaced
+recording is never served stale. The cache is bounded both by entry count and
+by the tracks' array memory; the least recently used entries are evicted first.
+
+``shared_cache`` is the one instance used by the GUI, both CLIs and anything
+embedding ``autostep``; ``open_cached()`` is a drop-in for ``open_recording()``
+backed by it. Recordings big enough to be streamed still start streaming on a
+miss; the track is assembled from the chunks as they play and cached once the
+first pass completes, so the next play starts from memory.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from autostep.binfmt import is_binary
+from autostep.recording import STREAM_THRESHOLD, load_track
+from autostep.schema import FORMAT_VERSION
+from autostep.stream import EVENTS_PER_CHUNK, JsonEventStream
+from autostep.track import EventTrack
+
+MAX_ENTRIES = 16
+MAX_BYTES = 256 << 20
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class _CachingStream(JsonEventStream):
+    """A ``JsonEventStream`` that hands the complete track to ``on_track`` after one pass."""
+
+    def __init__(self, path, on_track):
+        super().__init__(path)
+        self._on_track = [on_track]
+
+    def add_on_track(self, callback):
+        """Also hand the complete track to ``callback`` once the first pass finishes."""
+        if self._on_track is not None:
+            self._on_track.append(callback)
+
+    def chunks(self, size=EVENTS_PER_CHUNK):
+        if self._on_track is None:
+            yield from super().chunks(size)
+            return
+        parts = []
+        for chunk in super().chunks(size):
+            yield chunk
+            parts.append(EventTrack.from_dicts(chunk))
+        track = EventTrack.concat(parts)
+        track.screen_width = self.header.get('screen_width')
+        track.screen_height = self.header.get('screen_height')
+        track.meta = {k: v for k, v in self.items()
+                      if k not in ('screen_width', 'screen_height')}
+        track.meta['format_version'] = FORMAT_VERSION
+        callbacks, self._on_track = self._on_track, None
+        for on_track in callbacks:
+            on_track(track)
+
+
+class RecordingCache:
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()  # path -> (stamp, track, nbytes)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, path, stamp=None):
+        """Return the cached track for ``path``, or None if absent or stale."""
+        path = os.path.abspath(path)
+        stamp = stamp or _stamp(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._drop(path)
+            self.misses += 1
+            return None
+
+    def put(self, path, track, stamp=None):
+        path = os.path.abspath(path)
+        stamp = stamp or _stamp(path)
+        nbytes = track.nbytes
+        with self._lock:
+            if path in self._entries:
+                self._drop(path)
+            if nbytes > self.max_bytes:
+                return
+            self._entries[path] = (stamp, track, nbytes)
+            self.bytes += nbytes
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, path):
+        self.bytes -= self._entries.pop(path)[2]
+
+    def invalidate(self, path=None):
+        """Forget ``path``, or everything."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self.bytes = 0
+            elif os.path.abspath(path) in self._entries:
+                self._drop(os.path.abspath(path))
+
+    def load(self, path):
+        """Return the recording at ``path`` as an ``EventTrack``, decoding it on a miss."""
+        stamp = _stamp(path)
+        track = self.get(path, stamp)
+        if track is None:
+            track = load_track(path)
+            self.put(path, track, stamp)
+        return track
+
+    def open(self, path, stream_threshold=STREAM_THRESHOLD):
+        """Like ``open_recording()``, but served from the cache when possible."""
+        stamp = _stamp(path)
+        track = self.get(path, stamp)
+        if track is not None:
+            return track
+        if not is_binary(path) and stamp[1] >= stream_threshold:
+            return _CachingStream(path, lambda track: self.put(path, track, stamp))
+        track = load_track(path)
+        self.put(path, track, stamp)
+        return track
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else None,
+        }
+
+    def report(self):
+        return (f"{self.hits} hits, {self.misses} misses, {len(self._entries)} cached "
+                f"({self.bytes / (1 << 20):.1f} MB)")
+
+
+shared_cache = RecordingCache()
+
+
+def open_cached(path, stream_threshold=STREAM_THRESHOLD):
+    return shared_cache.open(path, stream_threshold)
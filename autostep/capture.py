@@ -0,0 +1,160 @@
+"""Preallocated ring buffer for listener callbacks.
+
+pynput callbacks only write numbers into fixed-width typed arrays; a consumer
+thread turns the slots into event dicts off the listener threads. Key and
+button objects are interned to small integer ids the first time they are seen.
+"""
+import threading
+import time
+from array import array
+
+clock = time.perf_counter
+
+MOUSE_MOVE, MOUSE_CLICK, KEY_PRESS, KEY_RELEASE = range(4)
+EVENT_TYPES = ('mouse_move', 'mouse_click', 'key_press', 'key_release')
+
+DEFAULT_CAPACITY = 1 << 16
+
+
+def key_name(key):
+    try:
+        k = key.char
+    except AttributeError:
+        k = None
+    return k if k is not None else str(key)
+
+
+class CaptureBuffer:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.time = array('d', bytes(8 * capacity))
+        self.type = array('b', bytes(capacity))
+        self.x = array('d', bytes(8 * capacity))
+        self.y = array('d', bytes(8 * capacity))
+        self.code = array('i', bytes(4 * capacity))
+        self.pressed = array('b', bytes(capacity))
+        self.names = []
+        self._ids = {}
+        self._lock = threading.Lock()
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+        self.high_water = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def _intern(self, obj, name):
+        with self._lock:
+            code = self._ids.get(obj)
+            if code is None:
+                code = self._ids[obj] = len(self.names)
+                self.names.append(name)
+            return code
+
+    def key_id(self, key):
+        code = self._ids.get(key)
+        return code if code is not None else self._intern(key, key_name(key))
+
+    def button_id(self, button):
+        code = self._ids.get(button)
+        return code if code is not None else self._intern(button, button.name)
+
+    def push(self, t, etype, x, y, code, pressed, started=None):
+        with self._lock:
+            head = self.head
+            used = head - self.tail
+            if used >= self.capacity:
+                self.dropped += 1
+                return
+            i = head % self.capacity
+            self.time[i] = t
+            self.type[i] = etype
+            self.x[i] = x
+            self.y[i] = y
+            self.code[i] = code
+            self.pressed[i] = pressed
+            self.head = head + 1
+            if used >= self.high_water:
+                self.high_water = used + 1
+            if started is not None:
+                latency = clock() - started
+                self.latency_total += latency
+                if latency > self.latency_max:
+                    self.latency_max = latency
+
+    def push_move(self, t, nx, ny):
+        self.push(t, MOUSE_MOVE, nx, ny, -1, 0, clock())
+
+    def push_click(self, t, nx, ny, button, pressed):
+        started = clock()
+        self.push(t, MOUSE_CLICK, nx, ny, self.button_id(button), pressed, started)
+
+    def push_key(self, t, key, pressed):
+        started = clock()
+        self.push(t, KEY_PRESS if pressed else KEY_RELEASE, 0.0, 0.0,
+                  self.key_id(key), pressed, started)
+
+    def drain(self, sink):
+        """Pass every buffered slot to ``sink`` as an event dict; return the count."""
+        head = self.head
+        tail = self.tail
+        names = self.names
+        for n in range(tail, head):
+            i = n % self.capacity
+            etype = self.type[i]
+            event = {'type': EVENT_TYPES[etype], 'time': self.time[i]}
+            if etype == MOUSE_MOVE:
+                event['nx'] = self.x[i]
+                event['ny'] = self.y[i]
+            elif etype == MOUSE_CLICK:
+                event['nx'] = self.x[i]
+                event['ny'] = self.y[i]
+                event['button'] = names[self.code[i]]
+                event['pressed'] = bool(self.pressed[i])
+            else:
+                event['key'] = names[self.code[i]]
+            sink(event)
+        self.tail = head
+        return head - tail
+
+    def start_consumer(self, sink, interval=0.05):
+        consumer = CaptureConsumer(self, sink, interval)
+        consumer.start()
+        return consumer
+
+    def stats(self):
+        captured = self.head
+        return {
+            'capacity': self.capacity,
+            'captured': captured,
+            'dropped': self.dropped,
+            'high_water': self.high_water,
+            'latency_mean_us': self.latency_total / captured * 1e6 if captured else 0.0,
+            'latency_max_us': self.latency_max * 1e6,
+        }
+
+    def report(self):
+        s = self.stats()
+        return (f"{s['captured']} captured, {s['dropped']} dropped, "
+                f"peak {s['high_water']}/{s['capacity']} slots, callback latency "
+                f"mean {s['latency_mean_us']:.1f} us, max {s['latency_max_us']:.1f} us")
+
+
+class CaptureConsumer(threading.Thread):
+    """Drains a ``CaptureBuffer`` into ``sink`` every ``interval`` seconds."""
+
+    def __init__(self, buffer, sink, interval=0.05):
+        super().__init__(daemon=True)
+        self.buffer = buffer
+        self.sink = sink
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.buffer.drain(self.sink)
+        self.buffer.drain(self.sink)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
@@ -0,0 +1,193 @@
+"""SQLite index of a recordings folder.
+
+One row per recording, keyed by file name and invalidated by ``(mtime, size)``,
+holds what the listings show: duration, per-type event counts, recorded
+resolution, size and timestamps. ``refresh()`` scans the folder once and only
+re-reads files whose stat changed, so a listing of a large (or remote) library
+is a single indexed query instead of opening every file. ``update()`` and
+``remove()`` apply single-file changes as they happen.
+
+The database lives next to the recordings as ``.catalog.sqlite3``; deleting it
+is always safe, it is rebuilt on the next refresh.
+"""
+import os
+import sqlite3
+import threading
+
+from autostep.capture import EVENT_TYPES
+from autostep.recording import is_listed_recording, load_track
+
+DB_NAME = '.catalog.sqlite3'
+SCHEMA_VERSION = 1
+
+SORT_COLUMNS = {
+    'name': 'name COLLATE NOCASE',
+    'modified': 'mtime_ns',
+    'created': 'created',
+    'duration': 'duration',
+    'size': 'size',
+    'events': 'events',
+}
+
+_COLUMNS = ('name', 'mtime_ns', 'size', 'created', 'duration', 'events',
+            'screen_width', 'screen_height') + EVENT_TYPES + ('error',)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS recordings (
+    name TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL,
+    duration REAL,
+    events INTEGER,
+    screen_width INTEGER,
+    screen_height INTEGER,
+    {', '.join(f'{t} INTEGER' for t in EVENT_TYPES)},
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS recordings_mtime ON recordings (mtime_ns);
+CREATE INDEX IF NOT EXISTS recordings_duration ON recordings (duration);
+CREATE INDEX IF NOT EXISTS recordings_size ON recordings (size);
+PRAGMA user_version = {SCHEMA_VERSION};
+"""
+
+
+def _created(st):
+    return getattr(st, 'st_birthtime', None) or st.st_ctime
+
+
+def describe_file(path, st=None):
+    """Return a catalog row (as a dict) for the recording at ``path``."""
+    st = st or os.stat(path)
+    row = dict.fromkeys(_COLUMNS)
+    row.update(name=os.path.basename(path), mtime_ns=st.st_mtime_ns, size=st.st_size,
+               created=_created(st))
+    try:
+        track = load_track(path)
+    except Exception as e:
+        row['error'] = str(e) or type(e).__name__
+        return row
+    row.update(duration=track.duration, events=len(track),
+               screen_width=track.screen_width, screen_height=track.screen_height,
+               **track.counts())
+    return row
+
+
+class Catalog:
+    def __init__(self, folder, db_path=None):
+        self.folder = folder
+        self.db_path = db_path or os.path.join(folder, DB_NAME)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        (version,) = self._db.execute('PRAGMA user_version').fetchone()
+        if version not in (0, SCHEMA_VERSION):
+            self._db.execute('DROP TABLE IF EXISTS recordings')
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _put(self, row):
+        placeholders = ', '.join('?' * len(_COLUMNS))
+        self._db.execute(f"INSERT OR REPLACE INTO recordings ({', '.join(_COLUMNS)}) "
+                         f"VALUES ({placeholders})", [row[c] for c in _COLUMNS])
+
+    def refresh(self):
+        """Bring the index in line with the folder; return what changed."""
+        with self._lock:
+            known = dict(((name, (mtime, size)) for name, mtime, size in
+                          self._db.execute('SELECT name, mtime_ns, size FROM recordings')))
+        changed = []
+        seen = set()
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not is_listed_recording(entry.name) or not entry.is_file():
+                    continue
+                st = entry.stat()
+                seen.add(entry.name)
+                if known.get(entry.name) != (st.st_mtime_ns, st.st_size):
+                    changed.append((entry.path, st))
+        removed = [name for name in known if name not in seen]
+
+        rows = [describe_file(path, st) for path, st in changed]
+        with self._lock, self._db:
+            for row in rows:
+                self._put(row)
+            self._db.executemany('DELETE FROM recordings WHERE name = ?',
+                                 [(name,) for name in removed])
+        added = sum(1 for path, _ in changed if os.path.basename(path) not in known)
+        return {'added': added, 'updated': len(changed) - added, 'removed': len(removed)}
+
+    def update(self, name):
+        """Re-index one file, or drop it if it no longer exists."""
+        path = os.path.join(self.folder, name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return self.remove(name)
+        with self._lock:
+            current = self._db.execute('SELECT mtime_ns, size FROM recordings WHERE name = ?',
+                                       (name,)).fetchone()
+        if current and tuple(current) == (st.st_mtime_ns, st.st_size):
+            return False
+        row = describe_file(path, st)
+        with self._lock, self._db:
+            self._put(row)
+        return True
+
+    def remove(self, name):
+        with self._lock, self._db:
+            return self._db.execute('DELETE FROM recordings WHERE name = ?',
+                                    (name,)).rowcount > 0
+
+    def _where(self, search):
+        if not search:
+            return '', []
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return " WHERE name LIKE ? ESCAPE '\\'", [f'%{escaped}%']
+
+    def query(self, sort='modified', descending=True, limit=None, offset=0, search=None):
+        """Return catalog rows as dicts, sorted and paginated in SQL."""
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key {sort!r}; expected one of {', '.join(SORT_COLUMNS)}")
+        where, params = self._where(search)
+        direction = 'DESC' if descending else 'ASC'
+        sql = (f"SELECT * FROM recordings{where} "
+               f"ORDER BY {SORT_COLUMNS[sort]} {direction}, name {direction}")
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    def names(self, sort='modified', descending=True, search=None):
+        return [row['name'] for row in self.query(sort, descending, search=search)]
+
+    def count(self, search=None):
+        where, params = self._where(search)
+        with self._lock:
+            return self._db.execute(f'SELECT COUNT(*) FROM recordings{where}', params).fetchone()[0]
+
+    def get(self, name):
+        with self._lock:
+            row = self._db.execute('SELECT * FROM recordings WHERE name = ?', (name,)).fetchone()
+        return dict(row) if row else None
+
+
+def format_row(row):
+    """One-line human summary of a catalog row."""
+    if row['error']:
+        return f"{row['name']}  (unreadable: {row['error']})"
+    parts = [f"{row['duration']:.1f}s", f"{row['events']} events"]
+    if row['screen_width']:
+        parts.append(f"{row['screen_width']}x{row['screen_height']}")
+    parts.append(f"{row['size'] / 1024:.0f} KB")
+    return f"{row['name']}  ({', '.join(parts)})"
@@ -0,0 +1,442 @@
+"""Non-interactive command line for scripted recording and playback.
+
+    python -m autostep list
+    python -m autostep play FILE [--repeats N] [--delay S] [--speed X] ...
+    python -m autostep record [--output PATH] [--duration S]
+    python -m autostep convert SRC DST
+    python -m autostep migrate [FILE ...] [--dry-run] [--jobs N]
+    python -m autostep edit SRC DST [--trim A:B] [--cut A:B] [--append FILE] ...
+
+``cli/main.py`` and ``cli/pmain.py`` hand their arguments over to ``main()``
+when started with any, and keep the interactive menu otherwise. Nothing here
+prompts; ``--json`` prints a single JSON object on stdout instead of the usual
+messages, and the exit status is one of the ``EXIT_*`` codes below.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from autostep.cache import shared_cache
+from autostep.catalog import SORT_COLUMNS, Catalog, format_row
+from autostep.decimate import MAX_RATE, MIN_DISTANCE, TOLERANCE
+from autostep.recording import list_recording_files, load_track, read_screen_size, save_recording
+from autostep.schema import FORMAT_VERSION
+
+EXIT_OK = 0
+EXIT_ERROR = 1        # unexpected failure
+EXIT_USAGE = 2        # bad arguments (argparse uses this too)
+EXIT_NOT_FOUND = 3    # recording file missing or unreadable
+EXIT_MISMATCH = 4     # screen resolution differs and --on-mismatch=abort
+EXIT_BACKEND = 5      # input backend or listener could not start
+EXIT_INTERRUPTED = 130
+
+DEFAULT_FOLDER = "recordings"
+MISMATCH_POLICIES = ('abort', 'scale', 'recorded')
+
+
+class CommandError(Exception):
+    def __init__(self, message, code=EXIT_ERROR):
+        super().__init__(message)
+        self.code = code
+
+
+def screen_size():
+    try:
+        import pyautogui
+        return tuple(pyautogui.size())
+    except Exception:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        try:
+            return root.winfo_screenwidth(), root.winfo_screenheight()
+        finally:
+            root.destroy()
+
+
+def parse_size(value):
+    try:
+        w, h = value.lower().split('x')
+        return int(w), int(h)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+
+
+def non_negative(value):
+    value = float(value)
+    if value < 0:
+        raise argparse.ArgumentTypeError("must not be negative")
+    return value
+
+
+def positive(value):
+    value = float(value)
+    if value <= 0:
+        raise argparse.ArgumentTypeError("must be positive")
+    return value
+
+
+def parse_range(value):
+    """``START:END`` in seconds; either side may be left empty."""
+    try:
+        start, end = value.split(':')
+        start = float(start) if start.strip() else None
+        end = float(end) if end.strip() else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START:END in seconds, got {value!r}")
+    if start is not None and end is not None and end <= start:
+        raise argparse.ArgumentTypeError(f"empty range {value!r}")
+    return start, end
+
+
+def parse_offset(value):
+    try:
+        dx, dy = value.split(',')
+        return int(dx), int(dy)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected DX,DY in pixels, got {value!r}")
+
+
+def resolve_path(folder, name):
+    if os.path.exists(name) or os.path.dirname(name):
+        return name
+    return os.path.join(folder, name)
+
+
+class Output:
+    """Human-readable progress, or one JSON document when ``--json`` is set."""
+
+    def __init__(self, as_json):
+        self.as_json = as_json
+
+    def say(self, message):
+        if not self.as_json:
+            print(message, flush=True)
+
+    def result(self, code, **fields):
+        if self.as_json:
+            fields.setdefault('status', 'ok' if code == EXIT_OK else 'error')
+            fields['exit_code'] = code
+            print(json.dumps(fields), flush=True)
+        return code
+
+
+def countdown(seconds, out):
+    if seconds > 0:
+        out.say(f"🕐 Starting in {seconds:g} seconds...")
+        time.sleep(seconds)
+
+
+# -- commands -----------------------------------------------------------
+
+def cmd_list(args, out):
+    if not os.path.isdir(args.folder):
+        raise CommandError(f"Folder not found: {args.folder}", EXIT_NOT_FOUND)
+    with Catalog(args.folder) as catalog:
+        if not args.no_refresh:
+            catalog.refresh()
+        total = catalog.count(args.search)
+        rows = catalog.query(args.sort, not args.asc, args.limit, args.offset, args.search)
+    if not rows:
+        out.say("⚠️ No recordings found.")
+    for row in rows:
+        out.say(f"  {format_row(row)}")
+    if args.limit is not None and total > len(rows):
+        out.say(f"  ({args.offset + 1}-{args.offset + len(rows)} of {total})")
+    return out.result(EXIT_OK, folder=args.folder, total=total, recordings=rows)
+
+
+def cmd_convert(args, out):
+    try:
+        track = load_track(resolve_path(args.folder, args.src))
+    except (OSError, ValueError) as e:
+        raise CommandError(f"Could not read {args.src}: {e}", EXIT_NOT_FOUND)
+    save_recording(args.dst, track)
+    out.say(f"✅ Wrote {len(track)} events to {args.dst}")
+    return out.result(EXIT_OK, src=args.src, dst=args.dst, events=len(track))
+
+
+def cmd_edit(args, out):
+    from autostep import edit
+
+    tracks = []
+    for name in [args.src] + args.append:
+        try:
+            tracks.append(load_track(resolve_path(args.folder, name)))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {name}: {e}", EXIT_NOT_FOUND)
+    before = {'events': len(tracks[0]), 'duration': tracks[0].duration}
+    try:
+        track = edit.splice(tracks, args.gap) if args.append else tracks[0]
+        # Cuts and the trim all refer to the input timeline, so apply them together.
+        ranges = list(args.cut)
+        if args.trim:
+            start, end = args.trim
+            ranges += [(None, start)] if start is not None else []
+            ranges += [(end, None)] if end is not None else []
+        track = edit.cut(track, *ranges) if ranges else track.balanced()
+        if args.scale is not None:
+            track = edit.scale_time(track, args.scale)
+        if args.offset:
+            track = edit.offset(track, *args.offset, screen=args.screen)
+    except ValueError as e:
+        raise CommandError(str(e), EXIT_USAGE)
+    dst = resolve_path(args.folder, args.dst)
+    save_recording(dst, track)
+    shared_cache.invalidate(dst)
+    out.say(f"✂️ {before['events']} events ({before['duration']:.1f}s) -> "
+            f"{len(track)} events ({track.duration:.1f}s)")
+    out.say(f"✅ Wrote {dst}")
+    return out.result(EXIT_OK, src=args.src, dst=dst, before=before,
+                      events=len(track), duration=track.duration)
+
+
+def cmd_migrate(args, out):
+    from autostep.migrate import CURRENT, FAILED, SKIPPED, UPGRADED, WOULD_UPGRADE, migrate_files
+
+    if args.files:
+        paths = [resolve_path(args.folder, name) for name in args.files]
+    elif os.path.isdir(args.folder):
+        paths = [os.path.join(args.folder, name)
+                 for name in sorted(list_recording_files(args.folder))]
+    else:
+        raise CommandError(f"Folder not found: {args.folder}", EXIT_NOT_FOUND)
+    if args.dry_run:
+        out.say("🔎 Dry run, nothing will be written.")
+
+    results = []
+    totals = dict.fromkeys((UPGRADED, WOULD_UPGRADE, CURRENT, SKIPPED, FAILED), 0)
+    for result in migrate_files(paths, args.screen, args.dry_run, args.jobs):
+        results.append(result)
+        totals[result['status']] += 1
+        if result['status'] == FAILED:
+            out.say(f"  ❌ {result['name']}: {result['error']}")
+        elif result['status'] in (UPGRADED, WOULD_UPGRADE):
+            changes = ', '.join(f"{n} {what}" for what, n in result['changes'].items())
+            out.say(f"  {'✅' if result['status'] == UPGRADED else '•'} {result['name']} "
+                    f"v{result['from_version']} -> v{FORMAT_VERSION}"
+                    + (f" ({changes})" if changes else ""))
+        elif result['status'] == SKIPPED:
+            out.say(f"  ⚠️ {result['name']}: {result['absolute']} events use absolute "
+                    "coordinates; pass --screen WxH with the resolution it was recorded at")
+    out.say(f"{totals[UPGRADED]} upgraded, {totals[WOULD_UPGRADE]} to upgrade, "
+            f"{totals[CURRENT]} already current, {totals[SKIPPED]} skipped, "
+            f"{totals[FAILED]} failed.")
+    code = EXIT_NOT_FOUND if totals[FAILED] else EXIT_OK
+    return out.result(code, dry_run=args.dry_run, format_version=FORMAT_VERSION,
+                      counts=totals, files=results)
+
+
+def cmd_play(args, out):
+    from autostep.backends import get_backend
+    from autostep.plancache import load_plan
+    from autostep.scheduler import Scheduler, run_plan
+    from autostep.timewarp import describe as describe_warp, warp_plan
+
+    path = resolve_path(args.folder, args.file)
+    try:
+        recorded = read_screen_size(path)
+    except (OSError, ValueError) as e:
+        raise CommandError(f"Could not read {path}: {e}", EXIT_NOT_FOUND)
+
+    if args.screen:
+        current = args.screen
+    elif args.backend in ('null', 'recording'):
+        # These backends never touch a display, so don't ask one for its size.
+        if not all(recorded):
+            raise CommandError(f"{os.path.basename(path)} has no recorded screen size; "
+                               f"pass --screen WxH to play it with the '{args.backend}' backend",
+                               EXIT_USAGE)
+        current = recorded
+    else:
+        current = screen_size()
+    if all(recorded) and tuple(recorded) != tuple(current):
+        message = (f"Resolution mismatch: recorded {recorded[0]}x{recorded[1]}, "
+                   f"current {current[0]}x{current[1]}")
+        if args.on_mismatch == 'abort':
+            raise CommandError(message, EXIT_MISMATCH)
+        out.say(f"⚠️ {message} ({args.on_mismatch})")
+        if args.on_mismatch == 'recorded':
+            current = recorded
+
+    try:
+        backend = get_backend(args.backend)
+    except Exception as e:
+        raise CommandError(f"Could not start backend '{args.backend}': {e}", EXIT_BACKEND)
+
+    try:
+        try:
+            plan = load_plan(path, current, backend, use_cache=not args.no_cache)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {path}: {e}", EXIT_NOT_FOUND)
+        cached = plan.from_cache
+        if cached:
+            out.say("📦 Using the cached plan.")
+        if plan.unresolved:
+            out.say(f"⚠️ Skipping keys that cannot be replayed: {plan.describe_unresolved()}")
+        plan = warp_plan(plan, speed=args.speed, max_gap=args.max_gap, no_delay=args.no_delay)
+        out.say(f"⏩ Timing: {describe_warp(args.speed, args.max_gap, args.no_delay)}, "
+                f"{plan.describe_length()}")
+
+        countdown(args.countdown, out)
+        scheduler = Scheduler()
+        started = time.perf_counter()
+        completed = run_plan(
+            plan, backend.handlers(), scheduler, args.repeats, args.delay,
+            on_iteration=lambda i: out.say(f"▶️ Playing iteration {i + 1} of {args.repeats}"))
+        elapsed = time.perf_counter() - started
+    finally:
+        backend.close()
+
+    out.say(f"⏱️ Timing: {scheduler.report()}")
+    return out.result(EXIT_OK, file=path, backend=args.backend, repeats=completed,
+                      actions=len(plan), elapsed=elapsed, lateness=scheduler.summary(),
+                      unresolved=dict(plan.unresolved), plan_cached=cached,
+                      cache=shared_cache.stats())
+
+
+def cmd_record(args, out):
+    try:
+        from autostep.session import PAUSED, RecordingSession
+    except Exception as e:
+        raise CommandError(f"Could not start input listeners: {e}", EXIT_BACKEND)
+
+    width, height = args.screen or screen_size()
+    os.makedirs(args.folder, exist_ok=True)
+    output = args.output or os.path.join(
+        args.folder, "recording_" + time.strftime("%Y%m%d_%H%M%S") + ".jsonl")
+    # The writer streams JSON Lines; other formats are converted once it is done.
+    stream_path = output if output.endswith('.jsonl') else output + '.jsonl'
+
+    countdown(args.countdown, out)
+    session = RecordingSession(stream_path, width, height, max_rate=args.max_rate,
+                               min_distance=args.min_distance, tolerance=args.tolerance)
+    try:
+        session.start()
+    except Exception as e:
+        raise CommandError(f"Could not start input listeners: {e}", EXIT_BACKEND)
+    session.on_state = lambda state: out.say("⏸️ Paused" if state == PAUSED else "▶️ Resumed")
+    out.say("🎙️  Recording. Press F9 to pause/resume, Esc to stop.")
+    interrupted = False
+    try:
+        session.wait(args.duration)
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        session.on_state = None
+        path = session.stop()
+
+    if path != output:
+        save_recording(output, load_track(path))
+        os.remove(path)
+    for line in session.report():
+        out.say(f"📊 {line}")
+    out.say(f"✅ Saved {session.count} events to: {output}")
+    return out.result(EXIT_OK, file=output, interrupted=interrupted, **session.stats())
+
+
+# -- entry point --------------------------------------------------------
+
+def build_parser(default_backend='pynput', folder=DEFAULT_FOLDER):
+    from autostep.backends import BACKENDS
+
+    parser = argparse.ArgumentParser(prog='autostep', description=__doc__.splitlines()[0])
+    parser.add_argument('--folder', default=folder, help="recordings folder (default: %(default)s)")
+    parser.add_argument('--json', action='store_true', help="print one JSON result object")
+    # --folder and --json are also accepted after the subcommand.
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--folder', default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+    common.add_argument('--json', action='store_true', default=argparse.SUPPRESS,
+                        help=argparse.SUPPRESS)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('list', parents=[common], help="list recordings")
+    p.add_argument('--sort', choices=list(SORT_COLUMNS), default='modified')
+    p.add_argument('--asc', action='store_true', help="ascending order (default: descending)")
+    p.add_argument('--limit', type=int, default=None)
+    p.add_argument('--offset', type=int, default=0)
+    p.add_argument('--search', help="only names containing this text")
+    p.add_argument('--no-refresh', action='store_true',
+                   help="answer from the catalog without rescanning the folder")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser('play', parents=[common], help="play a recording")
+    p.add_argument('file', help="recording path, or a name inside --folder")
+    p.add_argument('--repeats', type=int, default=1)
+    p.add_argument('--delay', type=non_negative, default=1.0, help="seconds between repeats")
+    p.add_argument('--countdown', type=non_negative, default=0.0)
+    p.add_argument('--speed', type=float, default=1.0)
+    p.add_argument('--max-gap', type=non_negative, default=None, help="cap idle gaps (seconds)")
+    p.add_argument('--no-delay', action='store_true', help="fire every action back to back")
+    p.add_argument('--backend', choices=list(BACKENDS), default=default_backend)
+    p.add_argument('--on-mismatch', choices=MISMATCH_POLICIES, default='abort',
+                   help="resolution mismatch: abort, scale to this screen, "
+                        "or use the recorded coordinates")
+    p.add_argument('--screen', type=parse_size, help="override the screen size (WxH)")
+    p.add_argument('--no-cache', action='store_true',
+                   help="compile from scratch instead of using the cached plan")
+    p.set_defaults(func=cmd_play)
+
+    p = sub.add_parser('record', parents=[common], help="record until Esc, Ctrl+C or --duration")
+    p.add_argument('--output', help="file to write (.jsonl, .json or .asr)")
+    p.add_argument('--duration', type=non_negative, default=None)
+    p.add_argument('--countdown', type=non_negative, default=0.0)
+    p.add_argument('--screen', type=parse_size, help="override the screen size (WxH)")
+    p.add_argument('--max-rate', type=non_negative, default=MAX_RATE,
+                   help="mouse moves kept per second, 0 = unlimited (default: %(default)s)")
+    p.add_argument('--min-distance', type=non_negative, default=MIN_DISTANCE,
+                   help="pixels the pointer must travel between kept moves (default: %(default)s)")
+    p.add_argument('--tolerance', type=non_negative, default=TOLERANCE,
+                   help="path simplification tolerance in pixels, 0 = off (default: %(default)s)")
+    p.set_defaults(func=cmd_record)
+
+    p = sub.add_parser('convert', parents=[common], help="convert between .json, .jsonl and .asr")
+    p.add_argument('src')
+    p.add_argument('dst')
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser('edit', parents=[common], help="trim, cut, splice, retime or move a recording")
+    p.add_argument('src')
+    p.add_argument('dst', help="file to write (may be SRC itself)")
+    p.add_argument('--append', action='append', default=[], metavar='FILE',
+                   help="play FILE after SRC (repeatable)")
+    p.add_argument('--gap', type=non_negative, default=0.0, help="seconds between appended recordings")
+    p.add_argument('--trim', type=parse_range, metavar='START:END', help="keep only this time range")
+    p.add_argument('--cut', type=parse_range, action='append', default=[], metavar='START:END',
+                   help="remove this time range and close the gap (repeatable)")
+    p.add_argument('--scale', type=positive, default=None,
+                   help="multiply every timestamp (0.5 = twice as fast)")
+    p.add_argument('--offset', type=parse_offset, metavar='DX,DY', help="move the pointer by DX,DY pixels")
+    p.add_argument('--screen', type=parse_size, help="screen size for --offset (default: recorded)")
+    p.set_defaults(func=cmd_edit)
+
+    p = sub.add_parser('migrate', parents=[common], help="rewrite legacy recordings in the current format")
+    p.add_argument('files', nargs='*', help="recordings to migrate (default: the whole folder)")
+    p.add_argument('--dry-run', action='store_true', help="report what would change")
+    p.add_argument('--jobs', type=int, default=None, help="worker processes (default: CPU count)")
+    p.add_argument('--screen', type=parse_size,
+                   help="resolution to assume for recordings that do not store one (WxH)")
+    p.set_defaults(func=cmd_migrate)
+    return parser
+
+
+def main(argv=None, default_backend='pynput', folder=DEFAULT_FOLDER):
+    parser = build_parser(default_backend, folder)
+    args = parser.parse_args(argv)
+    if getattr(args, 'repeats', 1) < 1:
+        parser.error("--repeats must be at least 1")
+    if getattr(args, 'speed', 1.0) <= 0:
+        parser.error("--speed must be positive")
+    out = Output(args.json)
+    try:
+        return args.func(args, out)
+    except CommandError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return out.result(e.code, error=str(e))
+    except KeyboardInterrupt:
+        return out.result(EXIT_INTERRUPTED, status='interrupted')
+    except Exception as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return out.result(EXIT_ERROR, error=str(e))
@@ -0,0 +1,64 @@
+"""Recording clock that stops while the session is paused.
+
+Paused spans are cut out of the timeline, so a recording paused for twenty
+minutes replays without a twenty-minute stall. Each pause is kept as a marker
+``{'time': <recording time>, 'duration': <wall seconds>}`` for the metadata.
+"""
+import threading
+import time
+
+clock = time.perf_counter
+
+
+class RecordingClock:
+    def __init__(self):
+        self._origin = None
+        self._paused_at = None
+        self._paused_total = 0.0
+        self._lock = threading.Lock()
+        self.pauses = []
+
+    def start(self):
+        self._origin = clock()
+        self._paused_at = None
+        self._paused_total = 0.0
+        self.pauses = []
+
+    @property
+    def paused(self):
+        return self._paused_at is not None
+
+    def now(self):
+        """Seconds of un-paused recording since ``start()``."""
+        # Both fields change together in resume(); reading them apart can step back in time.
+        with self._lock:
+            paused_at = self._paused_at
+            return (clock() if paused_at is None else paused_at) - self._origin - self._paused_total
+
+    def pause(self):
+        with self._lock:
+            if self._paused_at is None:
+                self._paused_at = clock()
+
+    def resume(self):
+        with self._lock:
+            if self._paused_at is None:
+                return
+            at = self._paused_at - self._origin - self._paused_total
+            duration = clock() - self._paused_at
+            self.pauses.append({'time': at, 'duration': duration})
+            self._paused_total += duration
+            self._paused_at = None
+
+    def toggle(self):
+        """Pause or resume; return True if the clock is now paused."""
+        if self.paused:
+            self.resume()
+        else:
+            self.pause()
+        return self.paused
+
+    def stop(self):
+        """Close a pause still open when recording ends and return the markers."""
+        self.resume()
+        return self.pauses
@@ -0,0 +1,155 @@
+"""Online reduction of recorded mouse motion.
+
+``MoveFilter`` sits between a ``CaptureBuffer`` consumer and the writer and
+thins out ``mouse_move`` events in three stages:
+
+* a sample-rate cap (``max_rate`` moves per second),
+* a minimum travel distance (``min_distance`` pixels) since the last kept move,
+* Ramer-Douglas-Peucker simplification with ``tolerance`` pixels over a
+  sliding window of ``window`` kept moves.
+
+Every other event passes through untouched and in order; it first flushes the
+pending window, so the pointer position right before a click or key press is
+exact. A move that the first two stages would drop is still kept when the
+path turns by more than ``TURN_ANGLE`` degrees there. Setting a stage to 0 (or
+``None``) disables it.
+"""
+import math
+
+MAX_RATE = 120.0
+MIN_DISTANCE = 2.0
+TOLERANCE = 1.0
+WINDOW = 64
+TURN_ANGLE = 45.0
+
+
+def simplify(points, tolerance):
+    """Indices of the ``(x, y, ...)`` points kept by Ramer-Douglas-Peucker."""
+    n = len(points)
+    if n < 3:
+        return list(range(n))
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    tol2 = tolerance * tolerance
+    stack = [(0, n - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        x0, y0 = points[lo][0], points[lo][1]
+        dx = points[hi][0] - x0
+        dy = points[hi][1] - y0
+        seg = dx * dx + dy * dy
+        best = -1
+        best_d = tol2
+        for i in range(lo + 1, hi):
+            px = points[i][0] - x0
+            py = points[i][1] - y0
+            # Distance to the segment, not the line, so reversals are kept.
+            u = min(1.0, max(0.0, (px * dx + py * dy) / seg)) if seg else 0.0
+            ex = px - u * dx
+            ey = py - u * dy
+            d = ex * ex + ey * ey
+            if d > best_d:
+                best, best_d = i, d
+        if best >= 0:
+            keep[best] = True
+            stack.append((lo, best))
+            stack.append((best, hi))
+    return [i for i in range(n) if keep[i]]
+
+
+class MoveFilter:
+    def __init__(self, sink, screen_width, screen_height, max_rate=MAX_RATE,
+                 min_distance=MIN_DISTANCE, tolerance=TOLERANCE, window=WINDOW):
+        self.sink = sink
+        self.width = screen_width
+        self.height = screen_height
+        self.max_rate = max_rate or 0.0
+        self.min_distance = min_distance or 0.0
+        self.tolerance = tolerance or 0.0
+        self.window = max(3, window)
+        self.seen = 0
+        self.kept = 0
+        self._min_interval = 1.0 / self.max_rate if self.max_rate else 0.0
+        self._turn_cos = math.cos(math.radians(TURN_ANGLE))
+        self._points = []   # (x, y, event); the first one is already emitted
+        self._tail = None   # latest move dropped by the rate/distance stages
+
+    def __call__(self, event):
+        if event['type'] != 'mouse_move':
+            self.flush()
+            self.sink(event)
+            return
+        self.seen += 1
+        point = (event['nx'] * self.width, event['ny'] * self.height, event)
+        if not self._points:
+            self._emit(point)
+            self._points.append(point)
+            return
+        tail = self._tail
+        if tail is not None and self._turns(self._points[-1], tail, point):
+            self._accept(tail)
+        if self._passes(self._points[-1], point):
+            self._accept(point)
+        else:
+            self._tail = point
+
+    def _passes(self, last, point):
+        if point[2]['time'] - last[2]['time'] < self._min_interval:
+            return False
+        if self.min_distance:
+            return math.hypot(point[0] - last[0], point[1] - last[1]) >= self.min_distance
+        return True
+
+    def _turns(self, a, b, c):
+        ux, uy = b[0] - a[0], b[1] - a[1]
+        vx, vy = c[0] - b[0], c[1] - b[1]
+        lu = math.hypot(ux, uy)
+        lv = math.hypot(vx, vy)
+        # Ignore sub-pixel jitter; it says nothing about direction.
+        if lu < 1.0 or lv < 1.0:
+            return False
+        return (ux * vx + uy * vy) / (lu * lv) < self._turn_cos
+
+    def _accept(self, point):
+        self._tail = None
+        self._points.append(point)
+        if len(self._points) >= self.window:
+            self._simplify()
+
+    def _simplify(self):
+        points = self._points
+        if len(points) > 1:
+            if self.tolerance:
+                indices = simplify(points, self.tolerance)
+            else:
+                indices = range(len(points))
+            for i in indices:
+                if i:
+                    self._emit(points[i])
+        self._points = points[-1:]
+
+    def _emit(self, point):
+        self.kept += 1
+        self.sink(point[2])
+
+    def flush(self):
+        """Emit everything still held back; the next move starts a new path."""
+        if self._tail is not None:
+            self._accept(self._tail)
+        self._simplify()
+        self._points = []
+
+    def stats(self):
+        return {
+            'max_rate': self.max_rate,
+            'min_distance': self.min_distance,
+            'tolerance': self.tolerance,
+            'moves_seen': self.seen,
+            'moves_kept': self.kept,
+            'reduction': 1.0 - self.kept / self.seen if self.seen else 0.0,
+        }
+
+    def report(self):
+        s = self.stats()
+        return (f"{s['moves_kept']}/{s['moves_seen']} mouse moves kept "
+                f"({s['reduction']:.0%} removed, tolerance {s['tolerance']:g}px)")
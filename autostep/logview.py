@@ -0,0 +1,89 @@
+"""Bounded, scrolling Tk log that can be mirrored to a rotating log file.
+
+``LogView`` keeps at most ``max_lines`` lines. It lets the text grow by
+``trim_batch`` lines past that and then drops the oldest lines in one delete,
+instead of trimming on every append. ``append(lines)`` writes a whole batch
+(one ``UIPump`` flush) with a single insert. It only follows the end of the log
+while the view is already scrolled to the bottom, so scrolling back to read
+is not interrupted.
+
+``mirror_to_file()`` sends every line, including those trimmed from the
+widget, to a size-rotated file through ``logging``. That way a run lasting
+days leaves a bounded on-disk history as well.
+"""
+import logging
+import logging.handlers
+import os
+import tkinter as tk
+from tkinter import ttk
+
+MAX_LINES = 2000
+TRIM_BATCH = 500
+LOG_MAX_BYTES = 1 << 20
+LOG_BACKUPS = 5
+
+LOGGER_NAME = 'autostep.gui'
+
+
+def mirror_to_file(path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+    """Mirror every ``LogView`` to ``path``, rotating at ``max_bytes`` and keeping ``backups`` old files."""
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in logger.handlers:
+        if getattr(handler, 'baseFilename', None) == os.path.abspath(path):
+            return handler
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(name)s: %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return handler
+
+
+class LogView(ttk.Frame):
+    def __init__(self, master, name='log', height=4, max_lines=MAX_LINES, trim_batch=TRIM_BATCH):
+        super().__init__(master)
+        self.max_lines = max_lines
+        self.trim_batch = trim_batch
+        self.logger = logging.getLogger(f"{LOGGER_NAME}.{name}")
+        self._count = 0
+
+        scrollbar = ttk.Scrollbar(self, orient="vertical")
+        self.text = tk.Text(self, height=height, state="disabled", yscrollcommand=scrollbar.set)
+        scrollbar.config(command=self.text.yview)
+        self.text.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+    def append(self, lines):
+        if not lines:
+            return
+        if self.logger.isEnabledFor(logging.INFO):
+            for line in lines:
+                self.logger.info(line)
+        text = self.text
+        follow = text.yview()[1] >= 1.0
+        # Only the tail of an oversized batch can survive the trim anyway.
+        lines = lines[-self.max_lines:]
+        text.config(state="normal")
+        text.insert(tk.END, "".join(line + "\n" for line in lines))
+        self._count += len(lines)
+        if self._count > self.max_lines + self.trim_batch:
+            excess = self._count - self.max_lines
+            text.delete("1.0", f"{excess + 1}.0")
+            self._count -= excess
+        text.config(state="disabled")
+        if follow:
+            text.see(tk.END)
+
+    def write(self, msg):
+        self.append([msg])
+
+    def clear(self):
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.config(state="disabled")
+        self._count = 0
+
+    def __len__(self):
+        return self._count
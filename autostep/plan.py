@@ -0,0 +1,188 @@
+"""Compile a loaded recording into a flat list of pre-resolved actions.
+
+Pixel coordinates are computed once for the playback resolution and button/key
+names are resolved to the objects the injector expects, so the playback loop
+only has to wait and dispatch. Keys that cannot be resolved are collected on
+the plan instead of being swallowed at replay time.
+"""
+from collections import Counter
+
+import numpy as np
+
+from autostep.capture import MOUSE_MOVE, MOUSE_CLICK
+from autostep.schema import upgrade_track
+from autostep.stream import JsonEventStream
+from autostep.track import EventTrack
+
+# Op codes double as indexes into Backend.handlers().
+MOVE, BUTTON_DOWN, BUTTON_UP, KEY_DOWN, KEY_UP = range(5)
+
+# Bump whenever compiled output changes; cached plans (see plancache) carry it.
+ENGINE_VERSION = 1
+
+LOWERED_DTYPE = np.dtype([
+    ('time', '<f8'), ('a', '<i8'), ('b', '<i8'), ('op', 'u1'), ('pad', 'V7'),
+])
+
+
+class Plan:
+    from_cache = False
+
+    def __init__(self, actions, size, unresolved):
+        self.actions = actions
+        self.size = size
+        self.unresolved = unresolved
+
+    def __len__(self):
+        return len(self.actions)
+
+    def __iter__(self):
+        return iter(self.actions)
+
+    @property
+    def duration(self):
+        return self.actions[-1][0] if self.actions else 0.0
+
+    def describe_unresolved(self):
+        return ", ".join(f"{k!r} x{n}" for k, n in self.unresolved.most_common())
+
+    def describe_length(self):
+        return f"{self.duration:.1f}s per iteration"
+
+
+class StreamingPlan:
+    """A plan compiled chunk by chunk while it plays, for recordings too big to decode first.
+
+    Every iteration re-reads ``source`` (a ``JsonEventStream``) and passes the
+    actions through ``transforms`` in order. ``unresolved``, ``len()`` and
+    ``duration`` describe the last complete pass.
+    """
+
+    from_cache = False
+
+    def __init__(self, source, size, backend, transforms=()):
+        self.source = source
+        self.size = size
+        self.backend = backend
+        self.transforms = tuple(transforms)
+        self.unresolved = Counter()
+        self.count = 0
+        self.duration = None
+
+    def pipe(self, transform):
+        """Return a copy that also feeds its actions through ``transform``."""
+        return StreamingPlan(self.source, self.size, self.backend, self.transforms + (transform,))
+
+    def _compiled(self):
+        unresolved = Counter()
+        for chunk in self.source.chunks():
+            plan = compile_plan(chunk, self.size, self.backend)
+            unresolved.update(plan.unresolved)
+            yield from plan.actions
+        self.unresolved = unresolved
+
+    def __iter__(self):
+        actions = self._compiled()
+        for transform in self.transforms:
+            actions = transform(actions)
+        count = 0
+        action = None
+        for count, action in enumerate(actions, 1):
+            yield action
+        self.count = count
+        self.duration = action[0] if action else 0.0
+
+    def __len__(self):
+        return self.count
+
+    describe_unresolved = Plan.describe_unresolved
+
+    def describe_length(self):
+        if self.duration is None:
+            return "streamed while playing"
+        return f"{self.duration:.1f}s per iteration"
+
+
+def compile_plan(data, size, backend):
+    """Return a ``Plan`` of ``(time, op, a, b)`` tuples for screen ``size``.
+
+    Button and key names are resolved through ``backend``; names it cannot
+    produce end up in ``Plan.unresolved``.
+    """
+    if isinstance(data, JsonEventStream):
+        return StreamingPlan(data, size, backend)
+    # Dicts and bare event lists take the same path as tracks: the schema
+    # upgrade decides once which coordinates are absolute.
+    return _compile_track(upgrade_track(EventTrack.from_recording(data)), size, backend)
+
+
+def _compile_track(track, size, backend):
+    return resolve_lowered(lower_track(track, size), track.names, size, backend)
+
+
+def lower_track(track, size):
+    """Compile ``track`` for screen ``size`` without resolving names.
+
+    Returns one ``LOWERED_DTYPE`` record per action: pixel coordinates in
+    ``a``/``b`` for moves, the name-table code in ``a`` for buttons and keys.
+    Nothing in it depends on the backend, so it can be cached on disk.
+    """
+    # Every event owns two action slots, the mouse move (if it has
+    # coordinates) followed by its button/key action.
+    width, height = size
+    n = len(track)
+    etype = track.type
+    is_mouse = (etype == MOUSE_MOVE) | (etype == MOUSE_CLICK)
+    is_click = etype == MOUSE_CLICK
+
+    records = np.zeros(2 * n, dtype=LOWERED_DTYPE)
+    records['time'] = np.repeat(track.time, 2)
+    x, y = track.pixels(width, height)
+    records['op'][0::2] = MOVE
+    records['a'][0::2] = x
+    records['b'][0::2] = y
+    records['op'][1::2] = np.where(is_click,
+                                   np.where(track.pressed, BUTTON_DOWN, BUTTON_UP),
+                                   np.where(track.pressed, KEY_DOWN, KEY_UP))
+    records['a'][1::2] = np.where(is_click, track.button, track.key)
+    records['b'][1::2] = -1
+
+    valid = np.empty(2 * n, dtype=bool)
+    valid[0::2] = is_mouse
+    valid[1::2] = etype != MOUSE_MOVE
+    return records[valid]
+
+
+def resolve_lowered(records, names, size, backend):
+    """Turn ``lower_track()`` output into a ``Plan`` for ``backend``."""
+    op = records['op']
+    codes = records['a']
+    is_move = op == MOVE
+    is_button = (op == BUTTON_DOWN) | (op == BUTTON_UP)
+    is_key = op >= KEY_DOWN
+
+    buttons = np.empty(len(names) + 1, dtype=object)
+    keys = np.empty(len(names) + 1, dtype=object)
+    # Code -1 (no name) stays unresolved: the extra last slot is left None.
+    for code in np.unique(codes[is_button & (codes >= 0)]).tolist():
+        buttons[code] = backend.resolve_button(names[code])
+    for code in np.unique(codes[is_key & (codes >= 0)]).tolist():
+        keys[code] = backend.resolve_key(names[code])
+
+    a = codes.astype(object)
+    a[is_button] = buttons[codes[is_button]]
+    a[is_key] = keys[codes[is_key]]
+    b = records['b'].astype(object)
+    b[~is_move] = None
+    resolved = a != None  # noqa: E711 -- elementwise comparison
+    valid = is_move | resolved
+
+    unresolved = Counter()
+    missing = ~valid
+    if missing.any():
+        for code, count in zip(*np.unique(codes[missing], return_counts=True)):
+            unresolved[names[code] if code >= 0 else None] += int(count)
+
+    actions = list(zip(records['time'][valid].tolist(), op[valid].tolist(),
+                       a[valid].tolist(), b[valid].tolist()))
+    return Plan(actions, tuple(size), unresolved)
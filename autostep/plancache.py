@@ -0,0 +1,156 @@
+"""On-disk cache of compiled playback plans.
+
+Compiling an unchanged recording for the same screen always produces the same
+actions, so the backend-independent part of a plan (``plan.lower_track()``) is
+written to ``<recordings>/.plans/`` and memory-mapped on the next play. The
+file name is the recording's content hash, the target resolution and
+``plan.ENGINE_VERSION``; editing the recording, playing at another resolution
+or upgrading the compiler simply misses and writes a new entry. Button and key
+names are resolved against the backend at load time (one lookup per distinct
+name), since resolved backend objects cannot be stored. The least recently used
+entries beyond ``MAX_PLANS`` are pruned whenever a plan is written.
+
+Layout, all little-endian::
+
+    header   32 bytes   magic b'ASPL', engine version u16, header size u16,
+                        screen width u32, screen height u32,
+                        action count u64, name table offset u64
+    records  32 bytes each (``plan.LOWERED_DTYPE``)
+    names    JSON list of button/key names
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from autostep.cache import open_cached
+from autostep.plan import ENGINE_VERSION, LOWERED_DTYPE, compile_plan, lower_track, resolve_lowered
+from autostep.track import EventTrack
+
+MAGIC = b'ASPL'
+EXTENSION = '.plan'
+CACHE_DIR = '.plans'
+MAX_PLANS = 256
+
+HEADER = struct.Struct('<4sHHIIQQ')
+
+_digests = {}
+
+
+def content_hash(path):
+    """Hex digest of the file's bytes, memoized per ``(path, mtime, size)``."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    digest = _digests.get(key)
+    if digest is None:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        digest = _digests[key] = h.hexdigest()
+    return digest
+
+
+def default_cache_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+
+
+def plan_file(cache_dir, digest, size):
+    width, height = size
+    return os.path.join(cache_dir, f"{digest}-{width}x{height}-e{ENGINE_VERSION}{EXTENSION}")
+
+
+def write_plan(path, records, names, size):
+    names_bytes = json.dumps(list(names)).encode('utf-8')
+    header = HEADER.pack(MAGIC, ENGINE_VERSION, HEADER.size, size[0], size[1], len(records),
+                         HEADER.size + records.nbytes)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(records.tobytes())
+        f.write(names_bytes)
+    os.replace(tmp, path)
+
+
+def read_plan(path, size, backend):
+    """Map a cached plan and resolve it for ``backend``; raise ValueError if it is invalid."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        if len(m) < HEADER.size:
+            raise ValueError(f"Truncated plan file: {path}")
+        magic, version, header_size, width, height, count, names_offset = HEADER.unpack_from(m, 0)
+        if (magic != MAGIC or version != ENGINE_VERSION or (width, height) != tuple(size)
+                or names_offset != header_size + count * LOWERED_DTYPE.itemsize
+                or names_offset > len(m)):
+            raise ValueError(f"Stale or corrupt plan file: {path}")
+        names = json.loads(m[names_offset:])
+        records = np.frombuffer(m, dtype=LOWERED_DTYPE, count=count, offset=header_size)
+        try:
+            return resolve_lowered(records, names, size, backend)
+        finally:
+            del records  # release the buffer before the map closes
+
+
+def prune(cache_dir, keep=MAX_PLANS):
+    try:
+        entries = [e for e in os.scandir(cache_dir) if e.name.endswith(EXTENSION)]
+    except FileNotFoundError:
+        return 0
+    if len(entries) <= keep:
+        return 0
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    removed = 0
+    for entry in entries[keep:]:
+        try:
+            os.remove(entry.path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def load_plan(path, size, backend, cache_dir=None, use_cache=True):
+    """Compile the recording at ``path`` for ``size``, going through the plan cache.
+
+    Returns a ``Plan`` (or a ``StreamingPlan`` for a large file that is not yet
+    decoded in memory); ``plan.from_cache`` tells whether the disk cache hit.
+    """
+    if not use_cache:
+        return compile_plan(open_cached(path), size, backend)
+    cache_dir = cache_dir or default_cache_dir(path)
+    target = plan_file(cache_dir, content_hash(path), size)
+    try:
+        plan = read_plan(target, size, backend)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError):
+        try:
+            os.remove(target)
+        except OSError:
+            pass
+    else:
+        os.utime(target)
+        plan.from_cache = True
+        return plan
+
+    data = open_cached(path)
+    if not isinstance(data, EventTrack):
+        # Streamed this time; the plan is written once the first pass has
+        # decoded the whole track, so the next process maps it instead.
+        data.add_on_track(lambda track: _store(target, lower_track(track, size), track.names,
+                                               size, cache_dir))
+        return compile_plan(data, size, backend)
+    records = lower_track(data, size)
+    _store(target, records, data.names, size, cache_dir)
+    return resolve_lowered(records, data.names, size, backend)
+
+
+def _store(target, records, names, size, cache_dir):
+    try:
+        write_plan(target, records, names, size)
+        prune(cache_dir)
+    except OSError:
+        pass  # a read-only folder just means no caching
@@ -0,0 +1,113 @@
+"""Reading recordings from disk, whatever format they were saved in."""
+import json
+import os
+
+from autostep.binfmt import BinaryRecording, is_binary
+from autostep.schema import upgrade, upgrade_track
+from autostep.stream import JsonEventStream
+
+RECORDING_EXTENSIONS = ('.json', '.jsonl', '.asr')
+# JSON recordings at least this large are streamed during playback instead of
+# being decoded up front.
+STREAM_THRESHOLD = 16 << 20
+# Fields written on the first line of a JSON Lines recording.
+_HEADER_FIELDS = ('screen_width', 'screen_height', 'format_version')
+
+
+def is_recording_file(name):
+    return name.endswith(RECORDING_EXTENSIONS)
+
+
+def is_listed_recording(name):
+    """A recording the user should see; dotfiles are our own temporaries (migrations, caches)."""
+    return is_recording_file(name) and not name.startswith('.')
+
+
+def list_recording_files(folder):
+    return [f for f in os.listdir(folder) if is_recording_file(f)]
+
+
+def read_jsonl(path):
+    """Read a JSON Lines recording written by ``RecordingWriter``."""
+    data = {'events': []}
+    events = data['events']
+    with open(path, 'r', encoding='utf-8') as f:
+        header = f.readline()
+        if header.strip():
+            data.update(json.loads(header))
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if 'meta' in item and 'type' not in item:
+                data.update(item['meta'])
+            else:
+                events.append(item)
+    return data
+
+
+def read_recording(path, screen=None):
+    """Return the recording at ``path``.
+
+    JSON and JSON Lines files are decoded into a dict and upgraded to the
+    current ``format_version`` (``screen`` is assumed for legacy files that do
+    not record their resolution); binary files are returned as a
+    memory-mapped ``BinaryRecording`` exposing the same ``get()`` lookups.
+    """
+    if is_binary(path):
+        return BinaryRecording(path)
+    if path.endswith('.jsonl'):
+        return upgrade(read_jsonl(path), screen)
+    with open(path, 'r', encoding='utf-8') as f:
+        return upgrade(json.load(f), screen)
+
+
+def open_recording(path, stream_threshold=STREAM_THRESHOLD):
+    """Like ``read_recording`` but returns a ``JsonEventStream`` for large JSON files."""
+    if not is_binary(path) and os.path.getsize(path) >= stream_threshold:
+        return JsonEventStream(path)
+    return read_recording(path)
+
+
+def read_screen_size(path):
+    """Return the recorded ``(width, height)`` without decoding the events."""
+    if is_binary(path):
+        with BinaryRecording(path) as recording:
+            return recording.screen_width or None, recording.screen_height or None
+    header = JsonEventStream(path).header
+    return header.get('screen_width'), header.get('screen_height')
+
+
+def load_track(path):
+    from autostep.track import EventTrack
+
+    data = read_recording(path)
+    try:
+        return upgrade_track(EventTrack.from_recording(data))
+    finally:
+        if isinstance(data, BinaryRecording):
+            data.close()
+
+
+def save_recording(path, data):
+    """Write ``data`` (dict, event list or ``EventTrack``) in the format implied by ``path``."""
+    from autostep.track import EventTrack
+
+    if path.endswith('.asr'):
+        upgrade_track(EventTrack.from_recording(data)).save_binary(path)
+        return
+    if isinstance(data, EventTrack):
+        data = upgrade_track(data).to_recording()
+    else:
+        data = upgrade(data)
+    with open(path, 'w', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            header = {k: v for k, v in data.items() if k in _HEADER_FIELDS}
+            meta = {k: v for k, v in data.items() if k not in _HEADER_FIELDS and k != 'events'}
+            f.write(json.dumps(header) + '\n')
+            for event in data.get('events', []):
+                f.write(json.dumps(event, separators=(',', ':')) + '\n')
+            if meta:
+                f.write(json.dumps({'meta': meta}) + '\n')
+        else:
+            json.dump(data, f)
@@ -0,0 +1,379 @@
+"""Virtualized Tk list of the recordings in a ``Catalog``.
+
+``RecordingList`` draws only the rows that fit in its canvas, reusing the same
+canvas items while scrolling, so 100k recordings scroll as smoothly as ten.
+Rows come from the catalog on a background thread in batches; the thread only
+puts them on a queue, which the widget drains from the Tk event loop. Typing
+in the filter box narrows the list as you type (a longer filter only searches
+the rows still shown), and the sort box orders by date, duration, size or
+name in memory. ``post_change()`` feeds single-file updates (from
+``autostep.watch``) in from any thread the same way.
+"""
+import queue
+import threading
+import time
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+
+BATCH_SIZE = 2000
+POLL_MS = 30
+IDLE_POLL_MS = 200
+
+SORTS = {
+    'Newest': ('modified', True),
+    'Oldest': ('modified', False),
+    'Longest': ('duration', True),
+    'Shortest': ('duration', False),
+    'Largest': ('size', True),
+    'Smallest': ('size', False),
+    'Name': ('name', False),
+}
+_SORT_FIELDS = {'modified': 'mtime_ns', 'duration': 'duration', 'size': 'size', 'name': 'name'}
+
+_RESET = object()
+_DONE = object()
+_RELOAD = object()
+
+
+def describe_row(row):
+    if row.get('error'):
+        return "unreadable"
+    parts = []
+    if row.get('duration') is not None:
+        parts.append(f"{row['duration']:.1f}s")
+    if row.get('size') is not None:
+        parts.append(f"{row['size'] / 1024:.0f} KB")
+    if row.get('mtime_ns'):
+        parts.append(time.strftime('%Y-%m-%d %H:%M', time.localtime(row['mtime_ns'] / 1e9)))
+    return "  ·  ".join(parts)
+
+
+class RecordingList(ttk.Frame):
+    def __init__(self, master, catalog, on_select=None, height=6, sort='Newest'):
+        super().__init__(master)
+        self.catalog = catalog
+        self.on_select = on_select
+        self.selected = None
+        self._rows = []          # every row, in the current sort order
+        self._view = []          # the rows matching the filter; never aliases _rows
+        self._index = {}         # name -> row
+        self._applied_filter = ''
+        self._top = 0
+        self._items = []
+        self._generation = 0
+        self._pending_select = None
+        self._loading = False
+        self._polling = False
+        self._queue = queue.Queue()
+
+        font = tkfont.nametofont('TkDefaultFont')
+        self._font = font
+        self._row_height = font.metrics('linespace') + 6
+
+        bar = ttk.Frame(self)
+        bar.pack(fill='x', pady=(0, 2))
+        ttk.Label(bar, text="Filter:").pack(side='left')
+        self.filter_var = tk.StringVar()
+        ttk.Entry(bar, textvariable=self.filter_var, width=18).pack(side='left', padx=4)
+        self.sort_var = tk.StringVar(value=sort)
+        ttk.Combobox(bar, textvariable=self.sort_var, values=list(SORTS),
+                     state='readonly', width=9).pack(side='right')
+        ttk.Label(bar, text="Sort:").pack(side='right', padx=4)
+        self.status = ttk.Label(bar, foreground='#666')
+        self.status.pack(side='right', padx=6)
+
+        body = ttk.Frame(self)
+        body.pack(fill='both', expand=True)
+        self.canvas = tk.Canvas(body, height=height * self._row_height, background='white',
+                                highlightthickness=1, highlightbackground='#aaa', takefocus=1)
+        self.scrollbar = ttk.Scrollbar(body, orient='vertical', command=self.yview)
+        self.canvas.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.filter_var.trace_add('write', lambda *_: self._apply_filter())
+        self.sort_var.trace_add('write', lambda *_: self._apply_sort())
+        self.canvas.bind('<Configure>', lambda e: self._layout())
+        self.canvas.bind('<Button-1>', self._on_click)
+        self.canvas.bind('<MouseWheel>', self._on_wheel)
+        self.canvas.bind('<Button-4>', lambda e: self.yview('scroll', -3, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.yview('scroll', 3, 'units'))
+        self.canvas.bind('<Up>', lambda e: self._move_selection(-1))
+        self.canvas.bind('<Down>', lambda e: self._move_selection(1))
+        self.canvas.bind('<Prior>', lambda e: self._move_selection(-self._visible_rows()))
+        self.canvas.bind('<Next>', lambda e: self._move_selection(self._visible_rows()))
+        self.bind('<Destroy>', lambda e: self._stop() if e.widget is self else None)
+
+    # -- loading --------------------------------------------------------
+
+    def load(self, select=None, refresh=True):
+        """(Re)populate from the catalog in the background; select ``select`` once it shows up."""
+        self._generation += 1
+        self._pending_select = select or self.selected
+        self._loading = True
+        self._queue.put((self._generation, _RESET))
+        sort, descending = SORTS[self.sort_var.get()]
+        threading.Thread(target=self._populate, daemon=True,
+                         args=(self._generation, sort, descending, refresh)).start()
+        if not self._polling:
+            self._polling = True
+            self._poll()
+
+    def _populate(self, generation, sort, descending, refresh):
+        def send_all():
+            offset = 0
+            while generation == self._generation:
+                rows = self.catalog.query(sort, descending, BATCH_SIZE, offset)
+                if not rows:
+                    break
+                self._queue.put((generation, rows))
+                offset += len(rows)
+
+        # Show what the catalog already knows at once, then catch up with the folder.
+        send_all()
+        if refresh and any(self.catalog.refresh().values()) and generation == self._generation:
+            self._queue.put((generation, _RESET))
+            send_all()
+        self._queue.put((generation, _DONE))
+
+    def post_change(self, name, row):
+        """Thread-safe: ``row`` for an added/changed file, None if ``name`` is gone.
+
+        ``name=None`` asks for a full reload.
+        """
+        if name is None:
+            item = _RELOAD
+        elif row is None:
+            item = ('remove', name)
+        else:
+            item = ('upsert', row)
+        self._queue.put((self._generation, item))
+
+    def _poll(self):
+        if self._polling_stopped():
+            self._polling = False
+            return
+        deadline = time.perf_counter() + 0.015
+        changed = resort = False
+        try:
+            while time.perf_counter() < deadline:
+                generation, item = self._queue.get_nowait()
+                if item is _RELOAD:
+                    self.load(refresh=False)
+                    continue
+                if generation != self._generation:
+                    continue
+                if item is _RESET:
+                    self._rows, self._view, self._index = [], [], {}
+                elif item is _DONE:
+                    self._loading = False
+                    resort = True
+                elif isinstance(item, tuple):
+                    action, value = item
+                    if action == 'upsert':
+                        self._upsert(value)
+                        resort = True
+                    else:
+                        self._remove(value)
+                else:
+                    self._add_batch(item)
+                changed = True
+        except queue.Empty:
+            pass
+        if resort:
+            self._apply_sort()
+        elif changed:
+            self._after_change()
+        self.after(POLL_MS if self._loading or not self._queue.empty() else IDLE_POLL_MS,
+                   self._poll)
+
+    def _polling_stopped(self):
+        try:
+            return not self.winfo_exists()
+        except tk.TclError:
+            return True
+
+    def _stop(self):
+        self._generation += 1
+
+    def _add_batch(self, rows):
+        text = self._applied_filter
+        for row in rows:
+            row['search'] = row['name'].lower()
+            self._index[row['name']] = row
+        self._rows.extend(rows)
+        self._view.extend(rows if not text else [r for r in rows if text in r['search']])
+
+    # -- single-row updates ---------------------------------------------
+
+    def upsert(self, row):
+        """Add or replace one row (e.g. a catalog row for a file that just changed)."""
+        self._upsert(row)
+        self._apply_sort()
+
+    def remove(self, name):
+        self._remove(name)
+        self._after_change()
+
+    def _upsert(self, row):
+        row = dict(row, search=row['name'].lower())
+        old = self._index.get(row['name'])
+        if old is not None:
+            self._rows.remove(old)
+        self._index[row['name']] = row
+        self._rows.append(row)
+        # _apply_sort() rebuilds _view
+
+    def _remove(self, name):
+        row = self._index.pop(name, None)
+        if row is None:
+            return
+        self._rows.remove(row)
+        if row in self._view:
+            self._view.remove(row)
+        if self.selected == name:
+            self.set_selection(None)
+
+    def names(self):
+        return [row['name'] for row in self._view]
+
+    # -- filtering and sorting --------------------------------------------
+
+    def _apply_filter(self):
+        text = self.filter_var.get().strip().lower()
+        previous = self._applied_filter
+        # A longer filter can only narrow what is already shown.
+        source = self._view if previous and previous in text else self._rows
+        self._view = list(source) if not text else [r for r in source if text in r['search']]
+        self._applied_filter = text
+        self._top = 0
+        self._after_change()
+
+    def _apply_sort(self):
+        sort, descending = SORTS[self.sort_var.get()]
+        field = _SORT_FIELDS[sort]
+        if field == 'name':
+            def key(row):
+                return row['search']
+        else:
+            def key(row):
+                return row.get(field) or 0
+        self._rows.sort(key=key, reverse=descending)
+        text = self._applied_filter
+        self._view = list(self._rows) if not text else [r for r in self._rows if text in r['search']]
+        self._after_change()
+
+    def _after_change(self):
+        if self._pending_select and self._pending_select in self._index:
+            name, self._pending_select = self._pending_select, None
+            self.set_selection(name, notify=name != self.selected)
+            return
+        self._clamp()
+        self._render()
+
+    # -- scrolling ------------------------------------------------------
+
+    def _visible_rows(self):
+        return max(1, self.canvas.winfo_height() // self._row_height)
+
+    def _clamp(self):
+        self._top = max(0, min(self._top, len(self._view) - self._visible_rows()))
+
+    def yview(self, *args):
+        total = len(self._view)
+        if args[0] == 'moveto':
+            self._top = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (self._visible_rows() if args[2] == 'pages' else 1)
+            self._top += step
+        self._clamp()
+        self._render()
+
+    def see(self, index):
+        visible = self._visible_rows()
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + visible:
+            self._top = index - visible + 1
+        self._clamp()
+
+    # -- drawing --------------------------------------------------------
+
+    def _layout(self):
+        needed = self._visible_rows() + 1
+        canvas = self.canvas
+        while len(self._items) < needed:
+            self._items.append((
+                canvas.create_rectangle(0, 0, 0, 0, width=0, fill=''),
+                canvas.create_text(0, 0, anchor='w', font=self._font),
+                canvas.create_text(0, 0, anchor='e', font=self._font, fill='#666'),
+            ))
+        self._clamp()
+        self._render()
+
+    def _render(self):
+        canvas = self.canvas
+        width = canvas.winfo_width()
+        h = self._row_height
+        view = self._view
+        for i, (rect, name, info) in enumerate(self._items):
+            index = self._top + i
+            y = i * h
+            if index < len(view):
+                row = view[index]
+                selected = row['name'] == self.selected
+                canvas.coords(rect, 0, y, width, y + h)
+                canvas.itemconfigure(rect, fill='#cce4ff' if selected else '')
+                canvas.coords(name, 6, y + h / 2)
+                canvas.itemconfigure(name, text=row['name'])
+                canvas.coords(info, width - 6, y + h / 2)
+                canvas.itemconfigure(info, text=describe_row(row))
+            else:
+                canvas.itemconfigure(rect, fill='')
+                canvas.itemconfigure(name, text='')
+                canvas.itemconfigure(info, text='')
+        total = len(view)
+        if total:
+            self.scrollbar.set(self._top / total, min(1.0, (self._top + self._visible_rows()) / total))
+        else:
+            self.scrollbar.set(0, 1)
+        shown = f"{total:,}" if total == len(self._rows) else f"{total:,} of {len(self._rows):,}"
+        self.status.config(text=shown + (" …" if self._loading else ""))
+
+    # -- selection ------------------------------------------------------
+
+    def _on_click(self, event):
+        self.canvas.focus_set()
+        index = self._top + event.y // self._row_height
+        if index < len(self._view):
+            self.set_selection(self._view[index]['name'])
+
+    def _on_wheel(self, event):
+        self.yview('scroll', -1 if event.delta > 0 else 1, 'units')
+
+    def _view_index(self, name):
+        row = self._index.get(name)
+        try:
+            return self._view.index(row)
+        except ValueError:
+            return -1
+
+    def _move_selection(self, step):
+        if not self._view:
+            return
+        current = self._view_index(self.selected)
+        self.set_selection(self._view[max(0, min(len(self._view) - 1, current + step))]['name'])
+
+    def select(self, name):
+        """Select ``name`` now, or as soon as it arrives (e.g. a file the watcher has not reported yet)."""
+        self._pending_select = name
+        self._after_change()
+
+    def set_selection(self, name, notify=True):
+        self.selected = name
+        index = self._view_index(name)
+        if index >= 0:
+            self.see(index)
+        self._render()
+        if notify and self.on_select:
+            self.on_select(name)
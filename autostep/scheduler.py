@@ -0,0 +1,232 @@
+"""Absolute-deadline playback scheduling.
+
+Every event is fired at ``origin + event_time`` on a monotonic clock rather
+than after a relative ``sleep`` from the previous event, so sleep overshoot and
+injection cost never accumulate over a long replay.
+
+A ``PlaybackControl`` makes those waits interruptible: every wait, whether
+for the next event or between repeats, blocks on one ``Condition`` that
+``pause()``, ``resume()`` and ``stop()`` notify, so they take effect at once.
+Time spent paused is added to the schedule instead of being caught up.
+"""
+import random
+import threading
+import time
+from array import array
+
+from autostep.plan import BUTTON_DOWN, KEY_DOWN
+
+clock = time.perf_counter
+
+# The last stretch of every wait is spun instead of slept, since OS sleeps
+# routinely overshoot by a millisecond or more.
+SPIN_THRESHOLD = 0.002
+# Condition waits overshoot more than plain sleeps, so the final few
+# milliseconds of an interruptible wait fall back to ``wait_until``.
+CONDITION_MARGIN = 0.005
+
+
+def wait_until(deadline, spin=SPIN_THRESHOLD):
+    while True:
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return
+        if remaining > spin:
+            time.sleep(remaining - spin)
+
+
+RUNNING, PAUSED, STOPPED = 'running', 'paused', 'stopped'
+
+
+class PlaybackStopped(Exception):
+    pass
+
+
+class PlaybackControl:
+    def __init__(self):
+        self.state = RUNNING
+        self._cond = threading.Condition()
+
+    def _set(self, state, allowed):
+        with self._cond:
+            if self.state not in allowed:
+                return False
+            self.state = state
+            self._cond.notify_all()
+            return True
+
+    @property
+    def paused(self):
+        return self.state == PAUSED
+
+    @property
+    def stopped(self):
+        return self.state == STOPPED
+
+    def pause(self):
+        return self._set(PAUSED, (RUNNING,))
+
+    def resume(self):
+        return self._set(RUNNING, (PAUSED,))
+
+    def stop(self):
+        return self._set(STOPPED, (RUNNING, PAUSED))
+
+    def toggle(self):
+        """Pause or resume; return True if playback is now paused."""
+        if not self.pause():
+            self.resume()
+        return self.paused
+
+    def wait_until(self, deadline, spin=SPIN_THRESHOLD):
+        """Sleep until ``deadline``, pushed back by any pause; return the seconds paused.
+
+        Raises ``PlaybackStopped`` as soon as ``stop()`` is called.
+        """
+        paused_total = 0.0
+        cond = self._cond
+        with cond:
+            while True:
+                if self.state == STOPPED:
+                    raise PlaybackStopped
+                if self.state == PAUSED:
+                    paused_at = clock()
+                    cond.wait_for(lambda: self.state != PAUSED)
+                    paused = clock() - paused_at
+                    paused_total += paused
+                    deadline += paused
+                    continue
+                remaining = deadline - clock() - CONDITION_MARGIN
+                if remaining <= 0:
+                    break
+                cond.wait(remaining)
+        wait_until(deadline, spin)
+        return paused_total
+
+    def sleep(self, seconds):
+        return self.wait_until(clock() + seconds)
+
+
+RESERVOIR_SIZE = 4096
+
+
+class LatenessStats:
+    """Running count/mean/max plus a fixed-size random sample for percentiles.
+
+    Memory and ``summary()`` cost stay constant however long playback runs.
+    """
+
+    def __init__(self, size=RESERVOIR_SIZE):
+        self.size = size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.sample = array('d')
+        self._random = random.Random(0)
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        self.count += 1
+        self.total += value
+        if self.count == 1 or value > self.max:
+            self.max = value
+        if len(self.sample) < self.size:
+            self.sample.append(value)
+        else:
+            # Reservoir sampling: every value so far is kept with equal probability.
+            slot = self._random.randrange(self.count)
+            if slot < self.size:
+                self.sample[slot] = value
+
+    def percentile(self, fraction):
+        ordered = sorted(self.sample)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Scheduler:
+    def __init__(self, spin=SPIN_THRESHOLD):
+        self.spin = spin
+        self.origin = None
+        self.lateness = LatenessStats()
+
+    def start(self):
+        self.origin = clock()
+
+    def shift(self, seconds):
+        """Push the remaining schedule back, e.g. after playback was paused."""
+        self.origin += seconds
+
+    def wait(self, event_time, control=None):
+        """Block until ``event_time`` seconds after ``start()``; return lateness.
+
+        With a ``control`` the wait can be paused (the schedule shifts by the
+        paused time) or stopped (``PlaybackStopped`` is raised).
+        """
+        deadline = self.origin + event_time
+        if control is None:
+            wait_until(deadline, self.spin)
+        else:
+            paused = control.wait_until(deadline, self.spin)
+            if paused:
+                self.shift(paused)
+                deadline += paused
+        late = clock() - deadline
+        self.lateness.append(late)
+        return late
+
+    def summary(self):
+        stats = self.lateness
+        if not stats.count:
+            return {'events': 0, 'mean_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        return {
+            'events': stats.count,
+            'mean_ms': stats.total / stats.count * 1000,
+            'p99_ms': stats.percentile(0.99) * 1000,
+            'max_ms': stats.max * 1000,
+        }
+
+    def report(self):
+        s = self.summary()
+        return (f"{s['events']} events, lateness mean {s['mean_ms']:.3f} ms, "
+                f"p99 {s['p99_ms']:.3f} ms, max {s['max_ms']:.3f} ms")
+
+
+def run_plan(plan, handlers, scheduler, repeats=1, delay=0.0, control=None, on_iteration=None):
+    """Play ``plan`` ``repeats`` times; return how many iterations completed.
+
+    ``plan`` is any iterable of ``(time, op, a, b)`` actions, so a
+    ``StreamingPlan`` starts playing before it has been fully decoded.
+    Stopping through ``control`` ends playback at once; anything the
+    interrupted iteration left pressed is released.
+    """
+    control = control or PlaybackControl()
+    wait = scheduler.wait
+    done = 0
+    try:
+        for cycle in range(repeats):
+            if on_iteration:
+                on_iteration(cycle)
+            scheduler.start()
+            held = {}
+            try:
+                for t, op, a, b in plan:
+                    wait(t, control)
+                    handlers[op](a, b)
+                    if op:
+                        if op == BUTTON_DOWN or op == KEY_DOWN:
+                            held[op + 1, a] = b  # the matching *_UP op
+                        else:
+                            held.pop((op, a), None)
+            except BaseException:
+                # Stopped, interrupted or failed: never leave keys held down.
+                for (op, a), b in held.items():
+                    handlers[op](a, b)
+                raise
+            done += 1
+            if cycle < repeats - 1 and delay:
+                control.sleep(delay)
+    except PlaybackStopped:
+        pass
+    return done
@@ -0,0 +1,105 @@
+"""Recording schema versions and the upgrade path between them.
+
+``format_version`` history:
+
+0. ``v1/main.py``: a bare event list, absolute ``x``/``y`` pixels, no screen size.
+1. Unversioned dicts with ``screen_width``/``screen_height`` and normalized
+   ``nx``/``ny``; the GUI stored buttons as ``str(button)`` (``"Button.left"``).
+2. Current: a dict carrying ``format_version``, plain button names
+   (``"left"``), and normalized coordinates. Absolute ``x``/``y`` survive only
+   when the recorded screen size is unknown.
+
+``upgrade()`` brings a loaded recording to the current version once, so the
+players never have to guess per event. ``python -m autostep migrate`` rewrites
+a whole folder in place.
+"""
+from collections import Counter
+
+import numpy as np
+
+FORMAT_VERSION = 2
+
+
+def detect_version(data):
+    if isinstance(data, list):
+        return 0
+    return data.get('format_version', 1)
+
+
+def is_current(data):
+    return not isinstance(data, list) and data.get('format_version') == FORMAT_VERSION
+
+
+def check_version(version):
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Recording uses format v{version}; this build reads up to v{FORMAT_VERSION}")
+
+
+def upgrade_events(events, width=None, height=None, changes=None):
+    """Yield ``events`` with legacy button names and absolute coordinates fixed (in place)."""
+    changes = Counter() if changes is None else changes
+    for event in events:
+        button = event.get('button')
+        if button is not None and '.' in button:
+            event['button'] = button.rsplit('.', 1)[-1]
+            changes['button names'] += 1
+        if width and height and 'x' in event:
+            event['nx'] = event.pop('x') / width
+            event['ny'] = event.pop('y') / height
+            changes['absolute coordinates'] += 1
+        yield event
+
+
+def upgrade(data, screen=None, changes=None):
+    """Return ``data`` (dict or legacy list) in the current schema.
+
+    Events are fixed in place. ``screen`` is the ``(width, height)`` to assume
+    when a legacy recording does not say what it was recorded at. ``changes``,
+    if given, is a ``Counter`` that receives what was rewritten.
+    """
+    changes = Counter() if changes is None else changes
+    version = detect_version(data)
+    check_version(version)
+    if version == FORMAT_VERSION:
+        return data
+    if isinstance(data, list):
+        data = {'events': data}
+        changes['bare event list'] += 1
+    width = data.get('screen_width')
+    height = data.get('screen_height')
+    if not (width and height) and screen:
+        width, height = screen
+        data['screen_width'], data['screen_height'] = width, height
+        changes['assumed screen size'] += 1
+    data['events'] = list(upgrade_events(data.get('events', []), width, height, changes))
+    data['format_version'] = FORMAT_VERSION
+    # Keep the conventional field order: screen size, version, events, then the rest.
+    ordered = {k: data[k] for k in ('screen_width', 'screen_height') if k in data}
+    ordered['format_version'] = FORMAT_VERSION
+    ordered.update(data)
+    return ordered
+
+
+def upgrade_track(track, screen=None, changes=None):
+    """``upgrade()`` for an ``EventTrack``; returns a new track when anything changed."""
+    changes = Counter() if changes is None else changes
+    version = track.meta.get('format_version', 1)
+    check_version(version)
+    if version == FORMAT_VERSION:
+        return track
+    names = list(track.names)
+    for code in np.unique(track.button[track.button >= 0]).tolist():
+        if '.' in names[code]:
+            changes['button names'] += int((track.button == code).sum())
+            names[code] = names[code].rsplit('.', 1)[-1]
+    width = track.screen_width or (screen[0] if screen else None)
+    height = track.screen_height or (screen[1] if screen else None)
+    upgraded = track._derive()
+    if track.absolute.any() and width and height:
+        changes['absolute coordinates'] += int(track.absolute.sum())
+        if not track.screen_width:
+            changes['assumed screen size'] += 1
+        upgraded = upgraded.normalized(width, height)
+    upgraded.names = names
+    upgraded.meta['format_version'] = FORMAT_VERSION
+    return upgraded
@@ -0,0 +1,221 @@
+"""One recording from start to saved file, shared by the CLI and the GUI.
+
+A ``RecordingSession`` owns the listeners, the capture buffer, the move
+filter, the clock and the writer. Its state moves ``idle -> recording <->
+paused -> stopping -> stopped``; every transition happens under one
+``threading.Condition``, so ``wait()`` wakes the moment a stop is requested
+instead of polling. ``finish()`` always stops and joins both listeners, even
+when saving fails, and records how long it took from the stop request until
+the file was in place (``stop_latency_ms``).
+
+Esc requests a stop and F9 toggles pause from anywhere; neither key is
+recorded.
+"""
+import threading
+import time
+
+from pynput import keyboard, mouse
+
+from autostep.capture import CaptureBuffer
+from autostep.clock import RecordingClock
+from autostep.decimate import MoveFilter
+from autostep.writer import RecordingWriter
+
+clock = time.perf_counter
+
+IDLE, RECORDING, PAUSED, STOPPING, STOPPED = 'idle', 'recording', 'paused', 'stopping', 'stopped'
+
+STOP_KEY = keyboard.Key.esc
+PAUSE_KEY = keyboard.Key.f9
+
+
+class RecordingSession:
+    def __init__(self, path, screen_width, screen_height, on_state=None, **filter_options):
+        self.path = path
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.on_state = on_state
+        self.state = IDLE
+        self.capture = CaptureBuffer()
+        self.clock = RecordingClock()
+        self.pauses = []
+        self.stop_latency_ms = None
+        self._filter_options = filter_options
+        self._cond = threading.Condition()
+        self._stop_requested_at = None
+        self._finishing = False
+        self.writer = self.move_filter = self._consumer = None
+        self._listeners = ()
+
+    # -- state ----------------------------------------------------------
+
+    def _set_state(self, state, allowed, action=None):
+        with self._cond:
+            if self.state not in allowed:
+                return False
+            if action is not None:
+                action()
+            self.state = state
+            if state == STOPPING:
+                self._stop_requested_at = clock()
+            self._cond.notify_all()
+        if self.on_state:
+            self.on_state(state)
+        return True
+
+    @property
+    def active(self):
+        return self.state in (RECORDING, PAUSED)
+
+    @property
+    def paused(self):
+        return self.state == PAUSED
+
+    def start(self):
+        if self.state != IDLE:
+            raise RuntimeError(f"Session already {self.state}")
+        w, h = self.screen_width, self.screen_height
+        self.writer = RecordingWriter(self.path, w, h)
+        self.move_filter = MoveFilter(self.writer.write, w, h, **self._filter_options)
+        self._consumer = self.capture.start_consumer(self.move_filter)
+        self._listeners = (
+            mouse.Listener(on_move=self._on_move, on_click=self._on_click),
+            keyboard.Listener(on_press=self._on_press, on_release=self._on_release),
+        )
+        self.clock.start()
+        try:
+            for listener in self._listeners:
+                listener.start()
+        except Exception:
+            self.cancel()
+            raise
+        self._set_state(RECORDING, (IDLE,))
+        return self
+
+    def pause(self):
+        return self._set_state(PAUSED, (RECORDING,), self.clock.pause)
+
+    def resume(self):
+        return self._set_state(RECORDING, (PAUSED,), self.clock.resume)
+
+    def toggle(self):
+        """Pause or resume; return True if the session is now paused."""
+        if not self.pause():
+            self.resume()
+        return self.paused
+
+    def request_stop(self):
+        """Ask the session to stop; safe from any thread, including listeners."""
+        return self._set_state(STOPPING, (IDLE, RECORDING, PAUSED))
+
+    def wait(self, timeout=None):
+        """Block until a stop is requested; return False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.state in (STOPPING, STOPPED), timeout)
+
+    def finish(self, path=None, discard=False):
+        """Tear everything down and save (or discard) the recording; return its path.
+
+        Only the first caller does the work; a concurrent or later call waits
+        for it and returns None.
+        """
+        self.request_stop()
+        with self._cond:
+            if self._finishing:
+                self._cond.wait_for(lambda: self.state == STOPPED)
+                return None
+            self._finishing = True
+            if self.writer is None:
+                self.state = STOPPED
+                self._cond.notify_all()
+                return None
+        try:
+            for listener in self._listeners:
+                listener.stop()
+            for listener in self._listeners:
+                if listener is not threading.current_thread() and listener.is_alive():
+                    listener.join()
+        finally:
+            if self._consumer is not None:
+                self._consumer.stop()
+            self.move_filter.flush()
+            self.pauses = self.clock.stop()
+            try:
+                if discard:
+                    self.writer.abort()
+                    saved = None
+                else:
+                    saved = self.path = self.writer.close(
+                        path, pauses=self.pauses, move_filter=self.move_filter.stats())
+            finally:
+                self.stop_latency_ms = (clock() - self._stop_requested_at) * 1000
+                self._set_state(STOPPED, (STOPPING,))
+        return saved
+
+    def stop(self, path=None):
+        return self.finish(path)
+
+    def cancel(self):
+        return self.finish(discard=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, *exc):
+        if self.state != STOPPED:
+            self.finish(discard=exc_type is not None)
+
+    # -- listener callbacks -------------------------------------------
+
+    def _on_move(self, x, y):
+        if self.state == RECORDING:
+            self.capture.push_move(self.clock.now(), x / self.screen_width, y / self.screen_height)
+
+    def _on_click(self, x, y, button, pressed):
+        if self.state == RECORDING:
+            self.capture.push_click(self.clock.now(), x / self.screen_width,
+                                    y / self.screen_height, button, pressed)
+
+    def _on_press(self, key):
+        if key == STOP_KEY:
+            self.request_stop()
+            return False
+        if key == PAUSE_KEY:
+            if self.active:
+                self.toggle()
+            return
+        if self.state == RECORDING:
+            self.capture.push_key(self.clock.now(), key, True)
+
+    def _on_release(self, key):
+        if key == STOP_KEY or key == PAUSE_KEY:
+            return
+        if self.state == RECORDING:
+            self.capture.push_key(self.clock.now(), key, False)
+
+    # -- reporting ------------------------------------------------------
+
+    @property
+    def count(self):
+        return self.writer.count if self.writer else 0
+
+    def stats(self):
+        return {
+            'events': self.count,
+            'pauses': len(self.pauses),
+            'paused_seconds': sum(p['duration'] for p in self.pauses),
+            'stop_latency_ms': self.stop_latency_ms,
+            'capture': self.capture.stats(),
+            'move_filter': self.move_filter.stats() if self.move_filter else None,
+        }
+
+    def report(self):
+        lines = [f"Capture: {self.capture.report()}"]
+        if self.move_filter:
+            lines.append(f"Moves: {self.move_filter.report()}")
+        if self.pauses:
+            lines.append(f"Cut {len(self.pauses)} pause(s), "
+                         f"{sum(p['duration'] for p in self.pauses):.1f}s of idle time.")
+        if self.stop_latency_ms is not None:
+            lines.append(f"Stop to saved: {self.stop_latency_ms:.1f} ms")
+        return lines
@@ -0,0 +1,193 @@
+"""Incremental reader for JSON and JSON Lines recordings.
+
+``JsonEventStream`` decodes the top-level fields that come before the
+``events`` array (``screen_width``/``screen_height``) when it is opened, and
+then yields events one at a time with ``JSONDecoder.raw_decode`` over a
+fixed-size read buffer. Nothing but the current buffer and the event being
+decoded is held in memory, and ``events()`` can be iterated again; every pass
+re-reads the file. Fields written after the array land in ``meta`` once a pass
+has reached the end. Legacy recordings are upgraded event by event as they
+are decoded (see ``autostep.schema``).
+"""
+import json
+import re
+
+from autostep.schema import FORMAT_VERSION, check_version, detect_version, upgrade_events
+
+READ_SIZE = 1 << 16
+EVENTS_PER_CHUNK = 4096
+
+_WS = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+class _Buffer:
+    def __init__(self, f, read_size):
+        self.f = f
+        self.read_size = read_size
+        self.buf = ''
+        self.pos = 0
+
+    def fill(self):
+        data = self.f.read(self.read_size)
+        if not data:
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character ('' at end of file)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars):
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError(f"Malformed recording: expected {' or '.join(chars)!s}, got {c!r}")
+        self.pos += 1
+        return c
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number that touches the end of the buffer may continue in the next read.
+            if end >= len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+class JsonEventStream:
+    def __init__(self, path, read_size=READ_SIZE):
+        self.path = path
+        self.read_size = read_size
+        self.jsonl = path.endswith('.jsonl')
+        self.header = {}
+        self.meta = {}
+        self.version = FORMAT_VERSION
+        for _ in self._parse():
+            break
+        self.legacy = self.version < FORMAT_VERSION
+
+    # -- dict-style access ----------------------------------------------
+
+    def get(self, key, default=None):
+        if key == 'events':
+            return self.events()
+        if key in self.header:
+            return self.header[key]
+        return self.meta.get(key, default)
+
+    def items(self):
+        yield from self.header.items()
+        yield from self.meta.items()
+
+    def __iter__(self):
+        return self.events()
+
+    def to_dict(self):
+        events = list(self.events())
+        data = dict(self.header)
+        data.update(self.meta)
+        data['format_version'] = FORMAT_VERSION
+        data['events'] = events
+        return data
+
+    # -- streaming ------------------------------------------------------
+
+    def events(self):
+        if self.legacy:
+            return upgrade_events(self._parse(), self.header.get('screen_width'),
+                                  self.header.get('screen_height'))
+        return self._parse()
+
+    def chunks(self, size=EVENTS_PER_CHUNK):
+        """Yield lists of up to ``size`` events."""
+        chunk = []
+        for event in self.events():
+            chunk.append(event)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _parse(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            if self.jsonl:
+                yield from self._parse_lines(f)
+            else:
+                yield from self._parse_object(_Buffer(f, self.read_size))
+
+    def _parse_lines(self, f):
+        first = f.readline()
+        if first.strip():
+            self.header = json.loads(first)
+        self._set_version(self.header)
+        meta = {}
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if 'meta' in item and 'type' not in item:
+                meta.update(item['meta'])
+            else:
+                yield item
+        self.meta = meta
+
+    def _parse_object(self, buf):
+        if buf.peek() == '[':
+            # Legacy recordings are a bare event list.
+            self._set_version([])
+            buf.pos += 1
+            yield from self._parse_array(buf)
+            return
+        buf.expect('{')
+        header = {}
+        meta = {}
+        target = header
+        if buf.peek() == '}':
+            self.header = header
+            self._set_version(header)
+            return
+        while True:
+            key = buf.decode()
+            buf.expect(':')
+            if key == 'events':
+                self.header = header
+                self._set_version(header)
+                target = meta
+                buf.expect('[')
+                yield from self._parse_array(buf)
+            else:
+                target[key] = buf.decode()
+            if buf.expect(',}') == '}':
+                break
+        if target is header:
+            self.header = header
+            self._set_version(header)
+        self.meta = meta
+
+    def _set_version(self, header):
+        self.version = detect_version(header)
+        check_version(self.version)
+
+    def _parse_array(self, buf):
+        if buf.peek() == ']':
+            buf.pos += 1
+            return
+        while True:
+            yield buf.decode()
+            if buf.expect(',]') == ']':
+                return
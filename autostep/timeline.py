@@ -0,0 +1,143 @@
+"""Level-of-detail summaries for drawing a recording's timeline.
+
+Redrawing millions of events one by one on every zoom or pan is far too
+slow, so ``TimelineSummary`` is built once per recording, all vectorized,
+and answers two queries in time proportional to what is drawn:
+
+* ``lanes(t0, t1, width)`` counts events per type per pixel column. It reads
+  from a pyramid of per-bin counts, where each level sums pairs of bins from
+  the one below. A window that holds few events is counted exactly from the
+  raw timestamps instead.
+* ``path(t0, t1, max_points)`` gives the mouse path as a polyline. Each level
+  keeps, for every bucket of ``PATH_FANOUT ** k`` mouse events, the first event
+  and the ones at the bucket's minimum and maximum x and y, so the path's
+  extent survives at every zoom. The finest level that fits in ``max_points``
+  is used.
+
+Coordinates come out normalized (0-1); legacy absolute pixels are scaled by the
+recording's screen size.
+"""
+import numpy as np
+
+from autostep.capture import EVENT_TYPES, MOUSE_CLICK, MOUSE_MOVE
+
+BASE_BINS = 1 << 16
+RAW_LIMIT = 50_000
+PATH_FANOUT = 16
+PATH_POINTS = 4000
+MARKERS = 300
+
+
+class TimelineSummary:
+    def __init__(self, track):
+        self.duration = track.duration
+        self.events = len(track)
+        self.screen_width = track.screen_width
+        self.screen_height = track.screen_height
+        self.times = track.time
+        self.types = track.type
+
+        mouse = (track.type == MOUSE_MOVE) | (track.type == MOUSE_CLICK)
+        x, y = track.nx[mouse], track.ny[mouse]
+        absolute = track.absolute[mouse]
+        if absolute.any():
+            width = track.screen_width or max(1.0, float(x[absolute].max()))
+            height = track.screen_height or max(1.0, float(y[absolute].max()))
+            x = np.where(absolute, x / width, x)
+            y = np.where(absolute, y / height, y)
+        self.mouse_time = track.time[mouse]
+        self.mouse_x = x
+        self.mouse_y = y
+        press = (track.type[mouse] == MOUSE_CLICK) & track.pressed[mouse]
+        self.press_index = np.flatnonzero(press)
+
+        self._build_counts()
+        self._build_path()
+
+    def _build_counts(self):
+        self.bin_width = (self.duration or 1.0) / BASE_BINS
+        bins = np.clip((self.times / self.bin_width).astype(np.int64), 0, BASE_BINS - 1)
+        flat = self.types.astype(np.int64) * BASE_BINS + bins
+        base = np.bincount(flat, minlength=len(EVENT_TYPES) * BASE_BINS)
+        level = base.reshape(len(EVENT_TYPES), BASE_BINS).astype(np.int32)
+        self.count_levels = [level]
+        while level.shape[1] > 1:
+            level = level[:, 0::2] + level[:, 1::2]
+            self.count_levels.append(level)
+
+    def _build_path(self):
+        x, y = self.mouse_x, self.mouse_y
+        n = len(x)
+        self.path_levels = [None]  # level 0 is every mouse event
+        size = PATH_FANOUT
+        while size < n:
+            full = n // size * size
+            picks = [np.arange(0, n, size)]
+            if full:
+                offsets = np.arange(0, full, size)
+                for column in (x, y):
+                    buckets = column[:full].reshape(-1, size)
+                    picks.append(offsets + buckets.argmin(axis=1))
+                    picks.append(offsets + buckets.argmax(axis=1))
+            if full < n:
+                tail = np.arange(full, n)
+                for column in (x, y):
+                    picks.append(tail[[column[full:].argmin(), column[full:].argmax()]])
+            picks.append([n - 1])
+            self.path_levels.append(np.unique(np.concatenate(picks)))
+            size *= PATH_FANOUT
+
+    def window(self, t0=None, t1=None):
+        return (0.0 if t0 is None else t0, self.duration if t1 is None else t1)
+
+    def lanes(self, t0, t1, width):
+        """``(len(EVENT_TYPES), width)`` event counts per pixel column of ``[t0, t1)``."""
+        width = int(width)
+        counts = np.zeros((len(EVENT_TYPES), max(width, 0)), dtype=np.int64)
+        if width <= 0 or t1 <= t0:
+            return counts
+        scale = width / (t1 - t0)
+        pixel = (t1 - t0) / width
+        lo, hi = np.searchsorted(self.times, (t0, t1))
+        if hi - lo <= RAW_LIMIT or pixel < self.bin_width:
+            columns = ((self.times[lo:hi] - t0) * scale).astype(np.int64)
+            np.clip(columns, 0, width - 1, out=columns)
+            flat = self.types[lo:hi].astype(np.int64) * width + columns
+            return np.bincount(flat, minlength=counts.size).reshape(counts.shape)
+        level = min(int(np.log2(pixel / self.bin_width)), len(self.count_levels) - 1)
+        bins = self.count_levels[level]
+        span = self.bin_width * (1 << level)
+        first = max(0, int(t0 // span))
+        last = min(bins.shape[1], int(np.ceil(t1 / span)))
+        centers = (np.arange(first, last) + 0.5) * span
+        columns = ((centers - t0) * scale).astype(np.int64)
+        inside = (columns >= 0) & (columns < width)
+        columns = columns[inside]
+        for lane in range(len(EVENT_TYPES)):
+            counts[lane] = np.bincount(columns, weights=bins[lane, first:last][inside],
+                                       minlength=width)
+        return counts
+
+    def path(self, t0, t1, max_points=PATH_POINTS):
+        """Normalized ``(x, y)`` arrays of the mouse path within ``[t0, t1)``."""
+        times = self.mouse_time
+        for index in self.path_levels:
+            level_times = times if index is None else times[index]
+            lo, hi = np.searchsorted(level_times, (t0, t1))
+            if hi - lo <= max_points:
+                break
+        else:
+            # Even the coarsest level is too dense: thin it evenly.
+            step = -(-(hi - lo) // max_points)
+            return self._points(index[lo:hi:step])
+        return self._points(slice(lo, hi) if index is None else index[lo:hi])
+
+    def presses(self, t0, t1, limit=MARKERS):
+        """Normalized ``(x, y)`` of mouse presses within ``[t0, t1)``, thinned to ``limit``."""
+        index = self.press_index
+        lo, hi = np.searchsorted(self.mouse_time[index], (t0, t1))
+        step = max(1, -(-(hi - lo) // limit))
+        return self._points(index[lo:hi:step])
+
+    def _points(self, index):
+        return self.mouse_x[index], self.mouse_y[index]
@@ -0,0 +1,92 @@
+"""Speed up compiled plans without changing what the target application sees.
+
+Gaps between actions are divided by ``speed``, capped at ``max_gap`` and
+dropped entirely with ``no_delay``. Two kinds of interval are protected:
+
+* a press/release hold never shrinks below ``min(original, min_hold)``, so
+  every key and button is down long enough to register;
+* two presses of the same button that were originally further apart than the
+  double-click window stay at least that far apart, so separate clicks are
+  not merged into a double click.
+"""
+from autostep.plan import Plan, StreamingPlan, BUTTON_DOWN, BUTTON_UP, KEY_DOWN, KEY_UP
+
+MIN_HOLD = 0.03
+DOUBLE_CLICK_WINDOW = 0.5
+
+
+def is_identity(speed=1.0, max_gap=None, no_delay=False):
+    return speed == 1.0 and max_gap is None and not no_delay
+
+
+def iter_warped(actions, speed=1.0, max_gap=None, no_delay=False,
+                min_hold=MIN_HOLD, double_click=DOUBLE_CLICK_WINDOW):
+    """Yield every ``(time, op, a, b)`` action re-timed; works on any iterable."""
+    if speed <= 0:
+        raise ValueError("speed must be positive")
+    held = {}
+    last_press = {}
+    prev_t = 0.0
+    prev_new = 0.0
+
+    for t, op, a, b in actions:
+        gap = t - prev_t
+        if no_delay:
+            gap = 0.0
+        else:
+            gap /= speed
+            if max_gap is not None and gap > max_gap:
+                gap = max_gap
+        new = prev_new + gap
+
+        if op == BUTTON_DOWN or op == KEY_DOWN:
+            # Buttons and keys can resolve to the same object ('left' in
+            # pyautogui), so holds are tracked per kind.
+            slot = (op == KEY_DOWN, a)
+            if op == BUTTON_DOWN and slot in last_press:
+                orig, warped = last_press[slot]
+                if t - orig >= double_click:
+                    new = max(new, warped + double_click)
+            held[slot] = (t, new)
+            if op == BUTTON_DOWN:
+                last_press[slot] = (t, new)
+        elif op == BUTTON_UP or op == KEY_UP:
+            slot = (op == KEY_UP, a)
+            if slot in held:
+                orig, warped = held.pop(slot)
+                new = max(new, warped + min(t - orig, min_hold))
+
+        yield new, op, a, b
+        prev_t = t
+        prev_new = new
+
+
+def warp_times(actions, speed=1.0, max_gap=None, no_delay=False,
+               min_hold=MIN_HOLD, double_click=DOUBLE_CLICK_WINDOW):
+    """Return the new timestamp of every ``(time, op, a, b)`` action."""
+    return [t for t, _, _, _ in iter_warped(actions, speed, max_gap, no_delay,
+                                             min_hold, double_click)]
+
+
+def warp_plan(plan, speed=1.0, max_gap=None, no_delay=False,
+              min_hold=MIN_HOLD, double_click=DOUBLE_CLICK_WINDOW):
+    """Return ``plan`` re-timed; the original plan is left untouched.
+
+    A ``StreamingPlan`` is re-timed lazily as it is played.
+    """
+    if is_identity(speed, max_gap, no_delay):
+        return plan
+    if isinstance(plan, StreamingPlan):
+        return plan.pipe(lambda actions: iter_warped(
+            actions, speed, max_gap, no_delay, min_hold, double_click))
+    actions = list(iter_warped(plan.actions, speed, max_gap, no_delay, min_hold, double_click))
+    return Plan(actions, plan.size, plan.unresolved)
+
+
+def describe(speed=1.0, max_gap=None, no_delay=False):
+    if no_delay:
+        return "no delay"
+    parts = [f"{speed:g}x"]
+    if max_gap is not None:
+        parts.append(f"gaps capped at {max_gap:g}s")
+    return ", ".join(parts)
@@ -0,0 +1,359 @@
+"""Columnar, NumPy-backed in-memory recording model.
+
+An ``EventTrack`` keeps one array per field instead of a list of dicts, so
+whole-recording operations (slicing, time shifts, resolution mapping,
+validation) are single vectorized expressions. Button and key names live in
+one small string table; the ``button`` and ``key`` columns index into it and
+are ``-1`` where unused or where the recording had no name (``"key": null``
+in old files). Mouse coordinates are normalized unless ``absolute``
+is set, which only happens for legacy recordings that stored raw pixels.
+"""
+import numpy as np
+
+from autostep.binfmt import (
+    BinaryRecording, RECORD, FLAG_ABSOLUTE, FLAG_PRESSED, write_sections)
+from autostep.capture import MOUSE_MOVE, MOUSE_CLICK, KEY_PRESS, KEY_RELEASE, EVENT_TYPES
+
+# Matches binfmt.RECORD so binary files map straight onto an array.
+RECORD_DTYPE = np.dtype([
+    ('time', '<f8'), ('nx', '<f8'), ('ny', '<f8'), ('code', '<i4'),
+    ('type', 'u1'), ('flags', 'u1'), ('pad', 'V2'),
+])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+COLUMNS = ('time', 'type', 'nx', 'ny', 'button', 'pressed', 'key', 'absolute')
+
+_TYPE_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+
+
+class EventTrack:
+    def __init__(self, time, type, nx, ny, button, pressed, key, absolute,
+                 names=(), screen_width=None, screen_height=None, meta=None):
+        self.time = np.asarray(time, dtype=np.float64)
+        self.type = np.asarray(type, dtype=np.uint8)
+        self.nx = np.asarray(nx, dtype=np.float64)
+        self.ny = np.asarray(ny, dtype=np.float64)
+        self.button = np.asarray(button, dtype=np.int32)
+        self.pressed = np.asarray(pressed, dtype=bool)
+        self.key = np.asarray(key, dtype=np.int32)
+        self.absolute = np.asarray(absolute, dtype=bool)
+        self.names = list(names)
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.meta = dict(meta or {})
+
+    @classmethod
+    def empty(cls, **kwargs):
+        return cls(*([()] * len(COLUMNS)), **kwargs)
+
+    def _derive(self, index=None, **columns):
+        """Return a track sharing names/metadata with some columns replaced."""
+        values = []
+        for name in COLUMNS:
+            if name in columns:
+                values.append(columns[name])
+            elif index is not None:
+                values.append(getattr(self, name)[index])
+            else:
+                values.append(getattr(self, name))
+        return EventTrack(*values, names=self.names, screen_width=self.screen_width,
+                          screen_height=self.screen_height, meta=self.meta)
+
+    # -- conversion -----------------------------------------------------
+
+    @classmethod
+    def from_dicts(cls, data):
+        """Build a track from a JSON-style recording (dict or bare event list)."""
+        if isinstance(data, list):
+            data = {'events': data}
+        events = data.get('events', [])
+        names = []
+        ids = {}
+        time, etype, nx, ny, button, pressed, key, absolute = ([] for _ in COLUMNS)
+
+        def name_id(name):
+            if name is None:
+                return -1
+            code = ids.get(name)
+            if code is None:
+                code = ids[name] = len(names)
+                names.append(name)
+            return code
+
+        for event in events:
+            code = _TYPE_CODES.get(event['type'])
+            if code is None:
+                raise ValueError(f"Unsupported event type {event['type']!r}")
+            time.append(event['time'])
+            etype.append(code)
+            if 'nx' in event:
+                nx.append(event['nx'])
+                ny.append(event['ny'])
+                absolute.append(False)
+            elif 'x' in event:
+                nx.append(event['x'])
+                ny.append(event['y'])
+                absolute.append(True)
+            else:
+                nx.append(0.0)
+                ny.append(0.0)
+                absolute.append(False)
+            if code == MOUSE_CLICK:
+                button.append(name_id(event['button']))
+                pressed.append(bool(event['pressed']))
+            else:
+                button.append(-1)
+                pressed.append(code == KEY_PRESS)
+            key.append(name_id(event['key']) if code in (KEY_PRESS, KEY_RELEASE) else -1)
+
+        meta = {k: v for k, v in data.items()
+                if k not in ('screen_width', 'screen_height', 'events')}
+        return cls(time, etype, nx, ny, button, pressed, key, absolute, names=names,
+                   screen_width=data.get('screen_width'),
+                   screen_height=data.get('screen_height'), meta=meta)
+
+    @classmethod
+    def from_binary(cls, recording):
+        view = recording.raw()
+        try:
+            records = np.frombuffer(view, dtype=RECORD_DTYPE)
+            etype = records['type'].copy()
+            code = records['code']
+            flags = records['flags']
+            is_click = etype == MOUSE_CLICK
+            is_key = (etype == KEY_PRESS) | (etype == KEY_RELEASE)
+            track = cls(
+                records['time'].copy(), etype, records['nx'].copy(), records['ny'].copy(),
+                np.where(is_click, code, -1),
+                np.where(is_click, (flags & FLAG_PRESSED) != 0, etype == KEY_PRESS),
+                np.where(is_key, code, -1),
+                (flags & FLAG_ABSOLUTE) != 0,
+                names=recording.names,
+                screen_width=recording.screen_width or None,
+                screen_height=recording.screen_height or None,
+                meta=recording.meta)
+            del records, code, flags
+        finally:
+            view.release()
+        return track
+
+    @classmethod
+    def from_recording(cls, data):
+        if isinstance(data, EventTrack):
+            return data
+        if isinstance(data, BinaryRecording):
+            return cls.from_binary(data)
+        return cls.from_dicts(data)
+
+    def to_dicts(self):
+        names = self.names
+        events = []
+        append = events.append
+        for t, etype, nx, ny, button, pressed, key, absolute in zip(
+                self.time.tolist(), self.type.tolist(), self.nx.tolist(), self.ny.tolist(),
+                self.button.tolist(), self.pressed.tolist(), self.key.tolist(),
+                self.absolute.tolist()):
+            event = {'type': EVENT_TYPES[etype], 'time': t}
+            if etype == MOUSE_MOVE or etype == MOUSE_CLICK:
+                if absolute:
+                    event['x'] = int(nx)
+                    event['y'] = int(ny)
+                else:
+                    event['nx'] = nx
+                    event['ny'] = ny
+                if etype == MOUSE_CLICK:
+                    event['button'] = names[button] if button >= 0 else None
+                    event['pressed'] = pressed
+            else:
+                event['key'] = names[key] if key >= 0 else None
+            append(event)
+        return events
+
+    def to_recording(self):
+        data = {}
+        if self.screen_width or self.screen_height:
+            data['screen_width'] = self.screen_width
+            data['screen_height'] = self.screen_height
+        data.update(self.meta)
+        data['events'] = self.to_dicts()
+        return data
+
+    def to_records(self):
+        records = np.zeros(len(self), dtype=RECORD_DTYPE)
+        records['time'] = self.time
+        records['nx'] = self.nx
+        records['ny'] = self.ny
+        records['code'] = np.where(self.type == MOUSE_CLICK, self.button, self.key)
+        records['type'] = self.type
+        is_click = self.type == MOUSE_CLICK
+        records['flags'] = ((is_click & self.pressed) * FLAG_PRESSED
+                            | self.absolute * FLAG_ABSOLUTE)
+        return records
+
+    def save_binary(self, path):
+        write_sections(path, self.screen_width, self.screen_height, len(self),
+                       self.to_records(), self.names, self.meta)
+
+    # -- vectorized operations -----------------------------------------
+
+    def __len__(self):
+        return len(self.time)
+
+    def get(self, key, default=None):
+        """Dict-style lookups, so a track can stand in for a loaded recording."""
+        if key in ('screen_width', 'screen_height'):
+            return getattr(self, key)
+        if key == 'events':
+            return self.to_dicts()
+        return self.meta.get(key, default)
+
+    @property
+    def nbytes(self):
+        return (sum(getattr(self, name).nbytes for name in COLUMNS)
+                + sum(len(name) for name in self.names))
+
+    def __getitem__(self, index):
+        """Slice, mask or fancy-index the track; always returns an ``EventTrack``."""
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 or None)
+        return self._derive(index)
+
+    @property
+    def duration(self):
+        return float(self.time[-1]) if len(self) else 0.0
+
+    def between(self, start=None, end=None):
+        """Events with ``start <= time < end`` (timestamps must be sorted)."""
+        lo = 0 if start is None else int(np.searchsorted(self.time, start, 'left'))
+        hi = len(self) if end is None else int(np.searchsorted(self.time, end, 'left'))
+        return self[lo:hi]
+
+    def shifted(self, seconds):
+        return self._derive(time=self.time + seconds)
+
+    def rebased(self):
+        """Shift so the first event happens at time 0."""
+        return self.shifted(-self.time[0]) if len(self) else self
+
+    def time_scaled(self, factor):
+        return self._derive(time=self.time * factor)
+
+    def balanced(self):
+        """Drop releases of keys/buttons that are not down, and release whatever is still down at the end.
+
+        A key or button is down after its last press until the next release,
+        so a slice cut out of a longer recording plays back without stuck input.
+        """
+        etype = self.type
+        is_click = etype == MOUSE_CLICK
+        inputs = np.flatnonzero(etype != MOUSE_MOVE)
+        if not len(inputs):
+            return self
+        # Buttons and keys may share a name ("left"), so keep them apart.
+        ident = np.where(is_click, self.button * 2, self.key * 2 + 1)[inputs]
+        sort = np.lexsort((inputs, ident))
+        order, ident = inputs[sort], ident[sort]
+        pressed = self.pressed[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = ident[1:] != ident[:-1]
+        was_down = np.zeros(len(order), dtype=bool)
+        was_down[1:] = pressed[:-1]
+        was_down &= ~first
+        # Repeated presses (key auto-repeat) are kept; only orphan releases go.
+        keep = np.ones(len(self), dtype=bool)
+        keep[order[~pressed & ~was_down]] = False
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = first[1:]
+        held = order[last & pressed]
+        if keep.all() and not len(held):
+            return self
+
+        track = self[keep]
+        if not len(held):
+            return track
+        mouse = np.flatnonzero((etype == MOUSE_MOVE) | is_click)
+        where = mouse[-1] if len(mouse) else held[0]
+        n = len(held)
+        release = EventTrack(
+            np.full(n, self.time[-1]), np.where(is_click[held], MOUSE_CLICK, KEY_RELEASE),
+            np.full(n, self.nx[where]), np.full(n, self.ny[where]),
+            self.button[held], np.zeros(n, dtype=bool), self.key[held],
+            np.full(n, self.absolute[where]), names=self.names)
+        return track._derive(**{name: np.concatenate([getattr(track, name), getattr(release, name)])
+                                for name in COLUMNS})
+
+    def pixels(self, width, height):
+        """Integer pixel coordinates of every event for a ``width`` x ``height`` screen."""
+        x = np.where(self.absolute, self.nx, self.nx * width)
+        y = np.where(self.absolute, self.ny, self.ny * height)
+        return x.astype(np.int64), y.astype(np.int64)
+
+    def normalized(self, width=None, height=None):
+        """Convert legacy absolute coordinates to normalized ones."""
+        width = width or self.screen_width
+        height = height or self.screen_height
+        if not self.absolute.any():
+            return self
+        if not (width and height):
+            raise ValueError("Screen size is required to normalize absolute coordinates")
+        absolute = self.absolute
+        track = self._derive(nx=np.where(absolute, self.nx / width, self.nx),
+                             ny=np.where(absolute, self.ny / height, self.ny),
+                             absolute=np.zeros(len(self), dtype=bool))
+        track.screen_width, track.screen_height = width, height
+        return track
+
+    def counts(self):
+        counts = np.bincount(self.type, minlength=len(EVENT_TYPES))
+        return {name: int(n) for name, n in zip(EVENT_TYPES, counts)}
+
+    def validate(self):
+        """Return a list of human-readable problems; empty when the track is sane."""
+        problems = []
+        if not len(self):
+            return problems
+        if not np.isfinite(self.time).all():
+            problems.append("non-finite timestamps")
+        if (self.time < 0).any():
+            problems.append(f"{int((self.time < 0).sum())} negative timestamps")
+        backwards = int((np.diff(self.time) < 0).sum())
+        if backwards:
+            problems.append(f"{backwards} timestamps go backwards")
+        mouse = ((self.type == MOUSE_MOVE) | (self.type == MOUSE_CLICK)) & ~self.absolute
+        outside = mouse & ((self.nx < 0) | (self.nx > 1) | (self.ny < 0) | (self.ny > 1))
+        if outside.any():
+            problems.append(f"{int(outside.sum())} coordinates outside the screen")
+        return problems
+
+    def summary(self):
+        return {
+            'events': len(self),
+            'duration': self.duration,
+            'counts': self.counts(),
+            'screen_width': self.screen_width,
+            'screen_height': self.screen_height,
+        }
+
+    @classmethod
+    def concat(cls, tracks):
+        """Join tracks end to end as-is, merging their name tables."""
+        tracks = list(tracks)
+        if not tracks:
+            return cls.empty()
+        ids = {}
+        button_parts = []
+        key_parts = []
+        for track in tracks:
+            # The trailing -1 keeps unused (-1) slots unused after remapping.
+            remap = np.array([ids.setdefault(n, len(ids)) for n in track.names] + [-1],
+                             dtype=np.int32)
+            button_parts.append(remap[track.button])
+            key_parts.append(remap[track.key])
+        columns = {name: np.concatenate([getattr(t, name) for t in tracks])
+                   for name in COLUMNS if name not in ('button', 'key')}
+        columns['button'] = np.concatenate(button_parts)
+        columns['key'] = np.concatenate(key_parts)
+        first = tracks[0]
+        return cls(*(columns[name] for name in COLUMNS), names=list(ids),
+                   screen_width=first.screen_width, screen_height=first.screen_height,
+                   meta=first.meta)
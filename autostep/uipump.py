@@ -0,0 +1,98 @@
+"""Hand work from background threads to the Tk thread.
+
+Tk must only be touched from the thread running ``mainloop()``. Input
+listeners and recording/playback threads therefore never call widgets (or
+``after()``) themselves: they put work on a ``UIPump`` and the Tk thread
+drains it in batches every ``INTERVAL_MS`` (about 30 Hz), within a time budget
+so a flood of events cannot starve the event loop. Log lines are coalesced:
+all lines queued for one log since the last drain reach it as a single
+``sink(lines)`` call, so a burst of messages costs one widget update.
+"""
+import queue
+import sys
+import time
+import tkinter as tk
+from concurrent.futures import Future
+
+INTERVAL_MS = 33
+BUDGET = 0.012
+
+_LINE = object()
+
+
+class UIPump:
+    def __init__(self, root, interval_ms=INTERVAL_MS, budget=BUDGET):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.budget = budget
+        self._queue = queue.SimpleQueue()
+        self._after = None
+
+    def start(self):
+        if self._after is None:
+            self._after = self.root.after(self.interval_ms, self._tick)
+        return self
+
+    def stop(self):
+        if self._after is not None:
+            self.root.after_cancel(self._after)
+            self._after = None
+
+    def call(self, fn, *args, **kwargs):
+        """Thread-safe: run ``fn(*args, **kwargs)`` on the Tk thread at the next drain."""
+        self._queue.put((fn, args, kwargs))
+
+    def request(self, fn, *args, **kwargs):
+        """Like ``call()``, but return a ``Future`` for the result (e.g. a dialog's answer).
+
+        Never wait on it from the Tk thread itself.
+        """
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        self.call(run)
+        return future
+
+    def write(self, sink, line):
+        """Thread-safe: queue ``line`` for ``sink``, which gets a list of lines per drain."""
+        self._queue.put((sink, line, _LINE))
+
+    def drain(self):
+        """Run queued work until the queue is empty or the time budget is spent."""
+        deadline = time.perf_counter() + self.budget
+        lines = {}
+        try:
+            while time.perf_counter() < deadline:
+                fn, args, kwargs = self._queue.get_nowait()
+                if kwargs is _LINE:
+                    lines.setdefault(fn, []).append(args)
+                    continue
+                # Keep order: lines queued before a call are shown before it runs.
+                self._flush(lines)
+                lines = {}
+                self._run(fn, *args, **kwargs)
+        except queue.Empty:
+            pass
+        self._flush(lines)
+
+    def _flush(self, lines):
+        for sink, batch in lines.items():
+            self._run(sink, batch)
+
+    def _run(self, fn, *args, **kwargs):
+        try:
+            fn(*args, **kwargs)
+        except Exception:
+            self.root.report_callback_exception(*sys.exc_info())
+
+    def _tick(self):
+        self._after = None
+        self.drain()
+        try:
+            self._after = self.root.after(self.interval_ms, self._tick)
+        except tk.TclError:
+            pass  # the window is gone
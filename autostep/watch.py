@@ -0,0 +1,230 @@
+"""Watch a recordings folder and keep a ``Catalog`` current without rescans.
+
+On Linux the folder is watched with inotify (through ``ctypes``, no extra
+dependency): a recording that is closed after writing or moved in counts as
+added/modified, one that is deleted or moved out as removed. Elsewhere, or if
+inotify is unavailable, the folder is polled by comparing ``(mtime, size)``
+snapshots. Either way only the files that changed are re-read.
+
+``CatalogWatcher`` applies every delta to the catalog (``update()`` /
+``remove()``) and then reports it to ``on_change(name, row)`` from its own
+thread; ``row`` is the new catalog row, or None when the file is gone. When
+inotify drops events (queue overflow) the catalog is refreshed and
+``on_change(None, None)`` asks for a full reload.
+
+    python -m autostep.watch FOLDER      # print deltas as they happen
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+from autostep.recording import is_listed_recording
+
+POLL_INTERVAL = 2.0
+
+ADDED, MODIFIED, REMOVED, OVERFLOW = 'added', 'modified', 'removed', 'overflow'
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+               | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT = struct.Struct('iIII')
+
+
+def _load_inotify():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, 'inotify_init1') else None
+
+
+class FolderWatcher:
+    """Calls ``callback(kind, name)`` from a background thread for every change."""
+
+    def __init__(self, folder, callback, poll_interval=POLL_INTERVAL, use_inotify=True):
+        self.folder = folder
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self._libc = _load_inotify() if use_inotify else None
+        self._fd = None
+        self._wake_r, self._wake_w = os.pipe()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.backend = None
+
+    def start(self, on_ready=None):
+        """Start watching; ``on_ready()`` runs on the watcher thread once events are being caught."""
+        if self._libc is not None:
+            self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            wd = -1
+            if self._fd >= 0:
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(self.folder), _WATCH_MASK)
+            if wd < 0:
+                if self._fd >= 0:
+                    os.close(self._fd)
+                self._fd = None
+        self.backend = 'inotify' if self._fd is not None else 'polling'
+        run = self._run_inotify if self._fd is not None else self._run_polling
+        self._thread = threading.Thread(target=run, args=(on_ready,), daemon=True,
+                                        name='autostep-watch')
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        os.write(self._wake_w, b'x')
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
+        self._fd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _emit(self, changes):
+        for name, kind in changes.items():
+            self.callback(kind, name)
+
+    # -- inotify --------------------------------------------------------
+
+    def _run_inotify(self, on_ready):
+        if on_ready:
+            on_ready()
+        while not self._stopped.is_set():
+            ready, _, _ = select.select([self._fd, self._wake_r], [], [])
+            if self._stopped.is_set():
+                return
+            if self._fd not in ready:
+                continue
+            try:
+                data = os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                continue
+            changes = {}
+            pos = 0
+            while pos < len(data):
+                wd, mask, cookie, length = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size
+                name = data[pos:pos + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+                pos += length
+                if mask & IN_Q_OVERFLOW:
+                    self.callback(OVERFLOW, None)
+                    changes.clear()
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    self._stopped.set()
+                    break
+                if mask & IN_ISDIR or not is_listed_recording(name):
+                    continue
+                if mask & (IN_DELETE | IN_MOVED_FROM):
+                    changes[name] = REMOVED
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    changes[name] = MODIFIED
+            # The last event per name wins, so a replace reports the new file.
+            self._emit(changes)
+
+    # -- polling --------------------------------------------------------
+
+    def _snapshot(self):
+        snapshot = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if is_listed_recording(entry.name) and entry.is_file():
+                        st = entry.stat()
+                        snapshot[entry.name] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            pass
+        return snapshot
+
+    def _run_polling(self, on_ready):
+        before = self._snapshot()
+        if on_ready:
+            on_ready()
+        while not self._stopped.wait(self.poll_interval):
+            after = self._snapshot()
+            changes = {name: REMOVED for name in before if name not in after}
+            for name, stamp in after.items():
+                old = before.get(name)
+                if old != stamp:
+                    changes[name] = ADDED if old is None else MODIFIED
+            before = after
+            self._emit(changes)
+
+
+class CatalogWatcher:
+    """Keeps ``catalog`` in step with its folder and reports each change."""
+
+    def __init__(self, catalog, on_change=None, **options):
+        self.catalog = catalog
+        self.on_change = on_change
+        self.ready = threading.Event()
+        self.watcher = FolderWatcher(catalog.folder, self._changed, **options)
+
+    def start(self):
+        # Events are caught before the baseline refresh, so nothing slips between them.
+        self.watcher.start(on_ready=self._baseline)
+        return self
+
+    def stop(self):
+        self.watcher.stop()
+
+    @property
+    def backend(self):
+        return self.watcher.backend
+
+    def _baseline(self):
+        if any(self.catalog.refresh().values()) and self.on_change:
+            self.on_change(None, None)
+        self.ready.set()
+
+    def _changed(self, kind, name):
+        if kind == OVERFLOW:
+            self.catalog.refresh()
+            row = None
+        elif kind == REMOVED:
+            self.catalog.remove(name)
+            row = None
+        else:
+            self.catalog.update(name)
+            row = self.catalog.get(name)
+            if row is None:
+                return
+        if self.on_change:
+            self.on_change(name, row)
+
+
+if __name__ == "__main__":
+    import time
+
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m autostep.watch FOLDER")
+    watcher = FolderWatcher(sys.argv[1], lambda kind, name: print(f"{kind:9} {name}", flush=True))
+    with watcher:
+        print(f"Watching {sys.argv[1]} ({watcher.backend}); Ctrl+C to stop.", flush=True)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
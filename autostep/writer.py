@@ -0,0 +1,128 @@
+"""Streaming, crash-tolerant recording writer.
+
+Events are appended as JSON Lines to ``<path>.part`` by a background thread
+that flushes and fsyncs every ``flush_interval`` seconds; ``close()`` renames
+the part file into place atomically. The first line is the header object, every
+following line is one event, and an optional last ``{"meta": {...}}`` line
+carries metadata known only at the end of the session.
+
+If the process dies mid-recording the ``.part`` file holds everything up to the
+last flush; ``recover_partials()`` turns such leftovers into normal recordings.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+from autostep.schema import FORMAT_VERSION
+
+PART_SUFFIX = '.part'
+FLUSH_INTERVAL = 1.0
+# A live writer touches its part file every flush, so anything older is orphaned.
+STALE_AFTER = 30.0
+
+_CLOSE = object()
+
+
+def _dumps(obj):
+    return json.dumps(obj, separators=(',', ':'))
+
+
+class RecordingWriter:
+    def __init__(self, path, screen_width, screen_height, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.part_path = path + PART_SUFFIX
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._queue = queue.SimpleQueue()
+        self._file = open(self.part_path, 'w', encoding='utf-8')
+        self._file.write(_dumps({'screen_width': screen_width, 'screen_height': screen_height,
+                                 'format_version': FORMAT_VERSION}) + '\n')
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, event):
+        self._queue.put(event)
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        os.utime(self.part_path)
+
+    def _run(self):
+        get = self._queue.get
+        write = self._file.write
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _CLOSE:
+                break
+            if item is not None:
+                write(_dumps(item) + '\n')
+                self.count += 1
+            if time.monotonic() >= next_flush:
+                self._sync()
+                next_flush = time.monotonic() + self.flush_interval
+        self._sync()
+
+    def _finish(self, meta):
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        if meta:
+            self._file.write(_dumps({'meta': meta}) + '\n')
+            self._sync()
+        self._file.close()
+
+    def close(self, path=None, **meta):
+        """Finish writing and atomically move the recording to ``path``."""
+        self._finish(meta)
+        if path:
+            self.path = path
+        os.replace(self.part_path, self.path)
+        return self.path
+
+    def abort(self):
+        self._finish(None)
+        os.remove(self.part_path)
+
+
+def recover_partial(part_path):
+    """Turn an orphaned ``.part`` file into a recording; return its path or None."""
+    with open(part_path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n')
+        if end < 0:
+            return None  # not even a complete header
+        # Drop a half-written last line.
+        f.truncate(end + 1)
+    base = part_path[:-len(PART_SUFFIX)]
+    root, ext = os.path.splitext(base)
+    target = base
+    n = 1
+    while os.path.exists(target):
+        target = f"{root}_recovered{n}{ext}"
+        n += 1
+    os.replace(part_path, target)
+    return target
+
+
+def recover_partials(folder, stale_after=STALE_AFTER):
+    recovered = []
+    now = time.time()
+    for name in os.listdir(folder):
+        if not name.endswith(PART_SUFFIX):
+            continue
+        part_path = os.path.join(folder, name)
+        try:
+            if now - os.path.getmtime(part_path) < stale_after:
+                continue
+            path = recover_partial(part_path)
+        except OSError:
+            continue
+        if path:
+            recovered.append(path)
+    return recovered
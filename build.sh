@@ -1 +1 @@
-pyinstaller --onefile --noconsole gui/app.py
\ No newline at end of file
+pyinstaller --onefile --noconsole --paths . gui/app.py
\ No newline at end of file
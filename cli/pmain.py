@@ -1,17 +1,19 @@
 import time
-import json
 import os
-import threading
+import sys
 import tkinter as tk
-import pyautogui
-from pynput import keyboard
 
-# Globals
-events = []
-recording = False
-paused = False
-start_time = None
-screen_width, screen_height = 0, 0
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from autostep.backends import BACKENDS, get_backend  # noqa: E402
+from autostep.cache import open_cached  # noqa: E402
+from autostep.catalog import Catalog, format_row  # noqa: E402
+from autostep.cli import main as run_command  # noqa: E402
+from autostep.plan import compile_plan  # noqa: E402
+from autostep.scheduler import Scheduler, run_plan  # noqa: E402
+from autostep.session import PAUSED, RECORDING, RecordingSession  # noqa: E402
+from autostep.timewarp import describe as describe_warp, warp_plan  # noqa: E402
+from autostep.writer import recover_partials  # noqa: E402
+
 recordings_folder = "recordings"
 
 os.makedirs(recordings_folder, exist_ok=True)
@@ -23,120 +25,55 @@ def get_screen_resolution():
     return root.winfo_screenwidth(), root.winfo_screenheight()
 
 
-def get_time():
-    return time.time() - start_time
+def on_state(state):
+    if state == PAUSED:
+        print("⏸️ Paused recording.")
+    elif state == RECORDING:
+        print("▶️ Resumed recording.")
 
 
 def record():
-    global recording, paused, start_time, events, screen_width, screen_height
-
-    events = []
-    paused = False
-    recording = True
-
     print("🕐 You have 5 seconds to switch to the window you want to record...")
     time.sleep(5)
 
     screen_width, screen_height = get_screen_resolution()
     print(f"📏 Screen resolution at recording: {screen_width}x{screen_height}")
-
-    start_time = time.time()
-    print("🎙️ Recording started. Press F9 to pause/resume, Esc to stop.")
-
-    def on_press(key):
-        global recording, paused
-        if key == keyboard.Key.esc:
-            recording = False
-            return False
-        if key == keyboard.Key.f9:
-            paused = not paused
-            print(f"{'⏸️ Paused' if paused else '▶️ Resumed'} recording.")
-            return
-
-        if not recording or paused:
-            return
-
-        try:
-            k = key.char
-        except AttributeError:
-            k = str(key)
-        events.append({'type': 'key_press', 'time': get_time(), 'key': k})
-
-    def on_release(key):
-        if not recording or paused:
-            return
-        try:
-            k = key.char
-        except AttributeError:
-            k = str(key)
-        events.append({'type': 'key_release', 'time': get_time(), 'key': k})
-
-    def on_move(x, y):
-        if not recording or paused:
-            return
-        events.append({'type': 'mouse_move', 'time': get_time(),
-                      'nx': x / screen_width, 'ny': y / screen_height})
-
-    def on_click(x, y, button, pressed):
-        if not recording or paused:
-            return
-        events.append({
-            'type': 'mouse_click',
-            'time': get_time(),
-            'nx': x / screen_width,
-            'ny': y / screen_height,
-            'button': str(button),
-            'pressed': pressed
-        })
-
-    # Setup listeners
-    from pynput import mouse
-    mouse_listener = mouse.Listener(on_move=on_move, on_click=on_click)
-    keyboard_listener = keyboard.Listener(
-        on_press=on_press, on_release=on_release)
-
-    mouse_listener.start()
-    keyboard_listener.start()
-
+    session = RecordingSession(
+        os.path.join(recordings_folder, "recording_" + time.strftime("%Y%m%d_%H%M%S") + ".jsonl"),
+        screen_width, screen_height)
+    session.start()
+    session.on_state = on_state
+    print("🎙️  Recording started. Press F9 to pause/resume, Esc to stop.")
     try:
-        while recording:
-            time.sleep(0.1)
+        session.wait()
     except KeyboardInterrupt:
         print("\n⏹️ Recording interrupted by user (Ctrl+C). Stopping...")
-        recording = False
     finally:
-        mouse_listener.stop()
-        keyboard_listener.stop()
-        mouse_listener.join()
-        keyboard_listener.join()
+        filepath = session.stop()
     print("🎙️ Recording stopped.")
+    for line in session.report():
+        print(f"📊 {line}")
 
     filename = input("Enter filename to save (blank = auto): ").strip()
-    if not filename:
-        filename = "recording_" + time.strftime("%Y%m%d_%H%M%S")
-    filepath = os.path.join(recordings_folder, filename + ".json")
+    if filename:
+        target = os.path.join(recordings_folder, filename + ".jsonl")
+        os.replace(filepath, target)
+        filepath = target
 
-    meta = {
-        'screen_width': screen_width,
-        'screen_height': screen_height,
-        'events': events
-    }
-
-    with open(filepath, 'w') as f:
-        json.dump(meta, f, indent=2)
-
-    print(f"\n✅ Saved recording to: {filepath}")
+    print(f"\n✅ Saved {session.count} events to: {filepath}")
 
 
 def list_recordings():
-    files = [f for f in os.listdir(recordings_folder) if f.endswith(".json")]
-    if not files:
+    with Catalog(recordings_folder) as catalog:
+        catalog.refresh()
+        rows = catalog.query()
+    if not rows:
         print("⚠️ No recordings found.")
     else:
-        print("📂 Available Recordings:")
-        for i, f in enumerate(files):
-            print(f"  {i+1}: {f}")
-    return files
+        print("📂 Available Recordings (newest first):")
+        for i, row in enumerate(rows):
+            print(f"  {i+1}: {format_row(row)}")
+    return [row['name'] for row in rows]
 
 
 def load_recording():
@@ -148,9 +85,7 @@ def load_recording():
         return None
     index = int(choice) - 1
     if 0 <= index < len(files):
-        filepath = os.path.join(recordings_folder, files[index])
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        return open_cached(os.path.join(recordings_folder, files[index]))
     else:
         print("❌ Invalid selection.")
         return None
@@ -160,7 +95,6 @@ def play(data):
     current_w, current_h = get_screen_resolution()
     recorded_w = data.get('screen_width')
     recorded_h = data.get('screen_height')
-    events = data.get('events', [])
 
     if (recorded_w, recorded_h) != (current_w, current_h):
         print(f"⚠️ Resolution mismatch:")
@@ -181,71 +115,58 @@ def play(data):
         print("❌ Invalid input. Using defaults.")
         repeat_count, repeat_delay = 1, 1.0
 
-    print("🕐 Prepare... Playback starts in 5 seconds.")
-    time.sleep(5)
-
-    for cycle in range(repeat_count):
-        print(f"▶️ Playing iteration {cycle+1} of {repeat_count}")
-        last_time = 0
-        for event in events:
-            delay = event['time'] - last_time
-            if delay > 0:
-                time.sleep(delay)
-            last_time = event['time']
-
-            if event['type'] == 'mouse_move':
-                nx = event.get('nx')
-                ny = event.get('ny')
-                if nx is not None and ny is not None:
-                    x = int(nx * current_w)
-                    y = int(ny * current_h)
-                    pyautogui.moveTo(x, y, duration=0)  # instant move
-
-            elif event['type'] == 'mouse_click':
-                nx = event.get('nx')
-                ny = event.get('ny')
-                if nx is not None and ny is not None:
-                    x = int(nx * current_w)
-                    y = int(ny * current_h)
-                    pyautogui.moveTo(x, y, duration=0)
-                button = 'left' if 'left' in event['button'] else 'right'
-                if event['pressed']:
-                    pyautogui.mouseDown(button=button)
-                else:
-                    pyautogui.mouseUp(button=button)
-
-            elif event['type'] == 'key_press':
-                key = event['key']
-                try:
-                    if len(key) == 1:
-                        pyautogui.keyDown(key)
-                    else:
-                        # Handle special keys
-                        key_name = key.replace('Key.', '').lower()
-                        pyautogui.keyDown(key_name)
-                except Exception:
-                    pass
+    speed = input(
+        "⏩ Playback speed (1 = real time, 0 = no delay, default 1): ").strip()
+    max_gap = input(
+        "✂️ Cap idle gaps at (seconds, blank = no cap): ").strip()
+    try:
+        speed = float(speed) if speed else 1.0
+        max_gap = float(max_gap) if max_gap else None
+        if speed < 0 or (max_gap is not None and max_gap < 0):
+            raise ValueError
+    except ValueError:
+        print("❌ Invalid input. Playing at real time.")
+        speed, max_gap = 1.0, None
 
-            elif event['type'] == 'key_release':
-                key = event['key']
-                try:
-                    if len(key) == 1:
-                        pyautogui.keyUp(key)
-                    else:
-                        key_name = key.replace('Key.', '').lower()
-                        pyautogui.keyUp(key_name)
-                except Exception:
-                    pass
+    backend_name = input(
+        f"🔌 Input backend ({'/'.join(BACKENDS)}, default pyautogui): ").strip() or 'pyautogui'
+    try:
+        backend = get_backend(backend_name)
+    except Exception as e:
+        print(f"❌ Could not start backend '{backend_name}': {e}")
+        return
+
+    plan = compile_plan(data, (current_w, current_h), backend)
+    if plan.unresolved:
+        print(f"⚠️ Skipping keys that cannot be replayed: {plan.describe_unresolved()}")
+    plan = warp_plan(plan, speed=speed or 1.0, max_gap=max_gap, no_delay=speed == 0)
+    print(f"⏩ Timing: {describe_warp(speed or 1.0, max_gap, speed == 0)}, "
+          f"{plan.describe_length()}")
 
-        if cycle < repeat_count - 1:
-            print(f"⏳ Waiting {repeat_delay} seconds before next loop...")
-            time.sleep(repeat_delay)
+    print("🕐 Prepare... Playback starts in 5 seconds.")
+    time.sleep(5)
 
+    scheduler = Scheduler()
+    if repeat_count > 1:
+        print(f"⏳ Repeating {repeat_count} times, {repeat_delay} seconds apart.")
+    try:
+        run_plan(plan, backend.handlers(), scheduler, repeat_count, repeat_delay,
+                 on_iteration=lambda i: print(f"▶️ Playing iteration {i+1} of {repeat_count}"))
+    except KeyboardInterrupt:
+        print("\n⏹️ Playback interrupted by user (Ctrl+C).")
+    finally:
+        backend.close()
+    print(f"⏱️ Timing: {scheduler.report()}")
     print("✅ Playback complete.")
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_command(sys.argv[1:], default_backend='pyautogui', folder=recordings_folder))
+
     print("== Auto Step Recorder (pyautogui) ==")
+    for path in recover_partials(recordings_folder):
+        print(f"🩹 Recovered unfinished recording: {path}")
     print("1 - Record a new session")
     print("2 - Play an existing session")
 
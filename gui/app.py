@@ -2,19 +2,39 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 import time
-import json
 import os
+import sys
 import pyautogui
-from pynput import keyboard, mouse
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from autostep.backends import BACKENDS, get_backend  # noqa: E402
+from autostep.cache import shared_cache  # noqa: E402
+from autostep.catalog import Catalog  # noqa: E402
+from autostep.logview import LogView, mirror_to_file  # noqa: E402
+from autostep.plan import compile_plan  # noqa: E402
+from autostep.plancache import load_plan  # noqa: E402
+from autostep.recording import read_screen_size  # noqa: E402
+from autostep.recordlist import RecordingList  # noqa: E402
+from autostep.scheduler import PlaybackControl, Scheduler, run_plan  # noqa: E402
+from autostep.session import PAUSED, RECORDING, RecordingSession  # noqa: E402
+from autostep.timelineview import TimelineView  # noqa: E402
+from autostep.timewarp import describe as describe_warp, warp_plan  # noqa: E402
+from autostep.uipump import UIPump  # noqa: E402
+from autostep.watch import CatalogWatcher  # noqa: E402
+from autostep.writer import recover_partials  # noqa: E402
+
 RECORDINGS_FOLDER = "recordings"
 os.makedirs(RECORDINGS_FOLDER, exist_ok=True)
 
 
 def generate_filename():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return os.path.join(RECORDINGS_FOLDER, f"recording_{timestamp}.json")
+    return os.path.join(RECORDINGS_FOLDER, f"recording_{timestamp}.jsonl")
+
+
+def print_transition(screen, ms, built):
+    print(f"[ui] {screen}: {ms:.1f} ms ({'built' if built else 'cached'})", flush=True)
 
 
 def show_toast(root, message, duration=2000):
@@ -31,27 +51,48 @@ class AutoStepApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("AutoIt - Step Recorder")
-        self.geometry("500x400")
+        self.geometry("540x560")
         self.resizable(True, True)
         # self.iconbitmap("icon.ico")
-        self.minsize(500, 420)
+        self.minsize(500, 480)
 
-        self.recording = False
-        self.paused = False
-        self.events = []
-        self.start_time = None
+        self.session = None
         self.filename = None
+        self.catalog = Catalog(RECORDINGS_FOLDER)
+        self.recordings_list = None
+        self.watcher = CatalogWatcher(self.catalog, on_change=self.recording_changed).start()
         self.screen_width, self.screen_height = pyautogui.size()
 
         self.repeat_count = tk.IntVar(value=1)
         self.repeat_delay = tk.DoubleVar(value=1.0)
+        self.backend_name = tk.StringVar(value="pyautogui")
+        self.speed = tk.DoubleVar(value=1.0)
+        self.max_gap = tk.StringVar(value="")
+        self.no_delay = tk.BooleanVar(value=False)
 
         self.main_frame = ttk.Frame(self)
         self.main_frame.pack(expand=True, fill="both")
+        self.screens = {}
+        self.current_screen = None
+        self.play_log = None
+        self._countdown_id = 0
+        # on_transition(screen, milliseconds, built) times every screen change.
+        self.on_transition = print_transition if os.environ.get('AUTOSTEP_UI_TIMING') else None
+        # Worker and listener threads only ever reach Tk through this pump.
+        self.ui = UIPump(self).start()
+        try:
+            mirror_to_file(os.path.join(RECORDINGS_FOLDER, '.logs', 'gui.log'))
+        except OSError:
+            pass  # the on-screen logs still work
 
         self.create_menu()
         self.create_initial_screen()
 
+        recovered = recover_partials(RECORDINGS_FOLDER)
+        if recovered:
+            self.after(500, lambda: show_toast(
+                self, f"Recovered {len(recovered)} unfinished recording(s)", 3000))
+
     def create_menu(self):
         menubar = tk.Menu(self)
         self.config(menu=menubar)
@@ -79,38 +120,64 @@ class AutoStepApp(tk.Tk):
                "- Select recording file and click Play")
         messagebox.showinfo("Shortcuts", msg)
 
-    def clear_frame(self):
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
-
-    def create_initial_screen(self):
-        self.clear_frame()
-        ttk.Label(self.main_frame, text="Auto Step Recorder",
+    ################## SCREENS #################
+
+    def show_screen(self, name, **kwargs):
+        """Swap to screen ``name``, building it on first use; ``enter_<name>_screen`` refreshes it."""
+        started = time.perf_counter()
+        screen = self.screens.get(name)
+        built = screen is None
+        if built:
+            screen = self.screens[name] = ttk.Frame(self.main_frame)
+            getattr(self, f"build_{name}_screen")(screen)
+        if self.current_screen is not screen:
+            if self.current_screen is not None:
+                self.current_screen.pack_forget()
+            screen.pack(expand=True, fill="both")
+            self.current_screen = screen
+        enter = getattr(self, f"enter_{name}_screen", None)
+        if enter:
+            enter(**kwargs)
+        self.update_idletasks()
+        if self.on_transition:
+            self.on_transition(name, (time.perf_counter() - started) * 1000, built)
+
+    def build_home_screen(self, frame):
+        ttk.Label(frame, text="Auto Step Recorder",
                   font=("Segoe UI", 18)).pack(pady=30)
 
-        ttk.Button(self.main_frame, text="Start Recording",
+        ttk.Button(frame, text="Start Recording",
                    command=self.start_recording_flow).pack(pady=10)
-        ttk.Button(self.main_frame, text="Play Recording",
+        ttk.Button(frame, text="Play Recording",
                    command=self.playback_flow).pack(pady=10)
 
+    def create_initial_screen(self):
+        self.show_screen('home')
+
     ############### RECORDING FLOW ################
 
     def start_recording_flow(self):
         self.filename = generate_filename()
         self.show_countdown(5, self.start_recording, on_cancel=self.create_initial_screen)
 
+    def build_countdown_screen(self, frame):
+        self.countdown_label = ttk.Label(frame, text="", font=("Segoe UI", 48))
+        self.countdown_label.pack(expand=True)
+        ttk.Button(frame, text="Cancel", command=self.cancel_countdown).pack(pady=10)
+
+    def enter_countdown_screen(self):
+        self.countdown_label.config(text="")
+
     def show_countdown(self, seconds, callback, on_cancel=None):
-        self.clear_frame()
+        self.show_screen('countdown')
         self.countdown_cancelled = False
-        self.countdown_label = ttk.Label(
-            self.main_frame, text="", font=("Segoe UI", 48))
-        self.countdown_label.pack(expand=True)
-        cancel_btn = ttk.Button(self.main_frame, text="Cancel", command=self.cancel_countdown)
-        cancel_btn.pack(pady=10)
-        self._countdown_callback = callback
-        self._countdown_on_cancel = on_cancel
+        # A new countdown retires any earlier one that is still ticking.
+        self._countdown_id += 1
+        countdown_id = self._countdown_id
 
         def countdown(n):
+            if countdown_id != self._countdown_id:
+                return
             if self.countdown_cancelled:
                 if on_cancel:
                     self.after(0, on_cancel)
@@ -127,191 +194,131 @@ class AutoStepApp(tk.Tk):
     def cancel_countdown(self):
         self.countdown_cancelled = True
 
-    def bind_recording_keys(self):
-        self.unbind_all('<F9>')
-        self.unbind_all('<Escape>')
-        self.bind_all('<F9>', lambda e: self.toggle_pause())
-        self.bind_all('<Escape>', lambda e: self.stop_recording())
-
-    def unbind_recording_keys(self):
-        self.unbind_all('<F9>')
-        self.unbind_all('<Escape>')
-
-    def start_recording(self):
-        self.recording = True
-        self.paused = False
-        self.events = []
-        self.screen_width, self.screen_height = pyautogui.size()
-        self.start_time = time.time()
-
-        self.clear_frame()
+    def build_recording_screen(self, frame):
         # Top bar with back button
-        top_frame = ttk.Frame(self.main_frame)
+        top_frame = ttk.Frame(frame)
         top_frame.pack(fill="x")
         back_btn = ttk.Button(top_frame, text="←", command=self.confirm_cancel_recording)
         back_btn.pack(side="left", padx=5, pady=5)
-        ttk.Label(self.main_frame, text="Recording...",
+        ttk.Label(frame, text="Recording...",
                   font=("Segoe UI", 16)).pack(pady=10)
 
-        controls_frame = ttk.Frame(self.main_frame)
+        controls_frame = ttk.Frame(frame)
         controls_frame.pack(pady=20)
 
-        self.pause_btn = ttk.Button(
+        self.record_pause_btn = ttk.Button(
             controls_frame, text="Pause", command=self.toggle_pause)
-        self.pause_btn.grid(row=0, column=0, padx=10)
+        self.record_pause_btn.grid(row=0, column=0, padx=10)
 
         stop_btn = ttk.Button(controls_frame, text="Stop",
                               command=self.stop_recording)
         stop_btn.grid(row=0, column=1, padx=10)
 
         restart_btn = ttk.Button(
-            self.main_frame, text="Restart Recording", command=self.restart_recording)
+            frame, text="Restart Recording", command=self.restart_recording)
         restart_btn.pack(pady=5)
 
-        self.log_text = tk.Text(self.main_frame, height=10, state="disabled")
+        self.log_text = LogView(frame, 'recording', height=10)
         self.log_text.pack(padx=10, pady=10, fill="x")
 
-        self.bind_recording_keys()
-        threading.Thread(target=self.record, daemon=True).start()
+    def enter_recording_screen(self):
+        self.record_pause_btn.config(text="Pause")
+        self.log_text.clear()
+
+    def start_recording(self):
+        self.screen_width, self.screen_height = pyautogui.size()
+        session = self.session = RecordingSession(
+            self.filename, self.screen_width, self.screen_height)
+        self.show_screen('recording')
+
+        try:
+            session.start()
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not start recording:\n{e}")
+            self.create_initial_screen()
+            return
+        # F9 and Esc are handled by the session's own listeners, focused or not.
+        session.on_state = self.on_session_state
+        threading.Thread(target=self.record, args=(session,), daemon=True).start()
+
+    def on_session_state(self, state):
+        # Runs on listener threads too; hand UI work to the Tk thread.
+        if state in (PAUSED, RECORDING):
+            self.ui.call(self.show_pause_state, state == PAUSED)
+
+    def show_pause_state(self, paused):
+        self.record_pause_btn.config(text="Resume" if paused else "Pause")
+        self.log(f"{'⏸️ Paused' if paused else '▶️ Resumed'} recording.")
 
     def toggle_pause(self):
-        self.paused = not self.paused
-        self.pause_btn.config(text="Resume" if self.paused else "Pause")
-        self.log(f"{'⏸️ Paused' if self.paused else '▶️ Resumed'} recording.")
+        if self.session:
+            self.session.toggle()
 
     def restart_recording(self):
-        if self.recording:
-            self.recording = False
+        if self.session:
+            self.session.cancel()
         self.start_recording_flow()
 
     def confirm_cancel_recording(self):
         if messagebox.askyesno("Cancel Recording", "Cancel and discard this recording?" ):
-            self.recording = False
-            self.unbind_recording_keys()
+            if self.session:
+                self.session.cancel()
             self.create_initial_screen()
 
     def log(self, msg):
-        self.log_text.config(state="normal")
-        self.log_text.insert(tk.END, msg + "\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state="disabled")
+        self.ui.write(self.write_log, msg)
 
-    def elapsed_time(self):
-        return time.time() - self.start_time
+    def write_log(self, lines):
+        self.log_text.append(lines)
 
     def stop_recording(self):
-        self.recording = False
-        self.unbind_recording_keys()
+        if self.session:
+            self.session.request_stop()
 
-    def record(self):
+    def record(self, session):
         self.log("🎙️ Recording started. Press F9 to pause/resume, Esc to stop.")
-
-        def on_press(key):
-            if not self.recording or self.paused:
-                return
-            if key == keyboard.Key.esc:
-                self.recording = False
-                return False
-            if key == keyboard.Key.f9:
-                self.paused = not self.paused
-                self.pause_btn.config(
-                    text="Resume" if self.paused else "Pause")
-                self.log(
-                    f"{'⏸️ Paused' if self.paused else '▶️ Resumed'} recording.")
-                return
-            try:
-                k = key.char
-            except AttributeError:
-                k = str(key)
-            self.events.append(
-                {'type': 'key_press', 'time': self.elapsed_time(), 'key': k})
-
-        def on_release(key):
-            if not self.recording or self.paused:
-                return
-            try:
-                k = key.char
-            except AttributeError:
-                k = str(key)
-            self.events.append(
-                {'type': 'key_release', 'time': self.elapsed_time(), 'key': k})
-
-        def on_move(x, y):
-            if not self.recording or self.paused:
-                return
-            self.events.append({'type': 'mouse_move', 'time': self.elapsed_time(),
-                                'nx': x / self.screen_width, 'ny': y / self.screen_height})
-
-        def on_click(x, y, button, pressed):
-            if not self.recording or self.paused:
-                return
-            self.events.append({'type': 'mouse_click', 'time': self.elapsed_time(),
-                                'nx': x / self.screen_width, 'ny': y / self.screen_height,
-                                'button': str(button), 'pressed': pressed})
-
-        mouse_listener = mouse.Listener(on_move=on_move, on_click=on_click)
-        keyboard_listener = keyboard.Listener(
-            on_press=on_press, on_release=on_release)
-
-        mouse_listener.start()
-        keyboard_listener.start()
-
-        while self.recording:
-            time.sleep(0.1)
-
-        mouse_listener.stop()
-        keyboard_listener.stop()
-        mouse_listener.join()
-        keyboard_listener.join()
-
-        self.log("Recording stopped.")
-        self.save_recording()
-
-    def save_recording(self):
-        meta = {
-            'screen_width': self.screen_width,
-            'screen_height': self.screen_height,
-            'events': self.events
-        }
+        session.wait()
         try:
-            with open(self.filename, 'w') as f:
-                json.dump(meta, f, indent=2)
-            self.log(f"Saved recording to: {os.path.basename(self.filename)}")
-            self.after(100, lambda: show_toast(self, "Recording completed!", 2000))
-            self.after(2100, lambda: self.playback_flow(select_file=os.path.basename(self.filename)))
+            path = session.finish()
         except Exception as e:
-            self.log(f"Error saving file: {e}")
-            messagebox.showerror("Error", f"Could not save recording:\n{e}")
-            self.create_initial_screen()
+            self.ui.call(self.recording_failed, e)
+            return
+        if path is None:
+            return  # cancelled or restarted; the part file is already gone
+        for line in session.report():
+            self.log(line)
+        self.log("Recording stopped.")
+        self.ui.call(self.recording_saved, session, path)
+
+    def recording_saved(self, session, path):
+        name = os.path.basename(path)
+        # Indexing decodes the whole file, so keep it off the Tk thread.
+        threading.Thread(target=self.index_recording, args=(name,), daemon=True).start()
+        self.log(f"Saved {session.count} events to: {os.path.basename(path)}")
+        self.after(100, lambda: show_toast(self, "Recording completed!", 2000))
+        self.after(2100, lambda: self.playback_flow(select_file=os.path.basename(path)))
+
+    def recording_failed(self, error):
+        self.log(f"Error saving file: {error}")
+        messagebox.showerror("Error", f"Could not save recording:\n{error}")
+        self.create_initial_screen()
 
     ################## PLAYBACK FLOW #################
 
-    def playback_flow(self, select_file=None):
-        self.clear_frame()
-        self.unbind_all('<F9>')
-        self.unbind_all('<Escape>')
-        self.bind_all('<Escape>', lambda e: self.create_initial_screen())
+    def build_playlist_screen(self, frame):
         # Top row: back
-        top_row = ttk.Frame(self.main_frame)
+        top_row = ttk.Frame(frame)
         top_row.pack(fill="x", pady=5)
         back_btn = ttk.Button(top_row, text="←", command=self.create_initial_screen)
         back_btn.pack(side="left", padx=5)
         # Label
-        ttk.Label(self.main_frame, text="Select recording to play",
+        ttk.Label(frame, text="Select recording to play",
                   font=("Segoe UI", 12)).pack(pady=2)
-        # Scrollable file list
-        list_frame = ttk.Frame(self.main_frame)
-        list_frame.pack(fill="x", padx=10)
-        list_scroll = ttk.Scrollbar(list_frame, orient="vertical")
-        self.recordings_listbox = tk.Listbox(list_frame, height=6, yscrollcommand=list_scroll.set)
-        list_scroll.config(command=self.recordings_listbox.yview)
-        self.recordings_listbox.pack(side="left", fill="both", expand=True)
-        list_scroll.pack(side="right", fill="y")
-        self.recordings_listbox.bind("<<ListboxSelect>>", self.recording_selected)
-        recordings = [f for f in os.listdir(RECORDINGS_FOLDER) if f.endswith(".json")]
-        for rec in recordings:
-            self.recordings_listbox.insert(tk.END, rec)
-        self.controls_row = ttk.Frame(self.main_frame)
+        # Scrollable file list, filled in the background
+        self.recordings_list = RecordingList(frame, self.catalog,
+                                             on_select=self.recording_selected, height=6)
+        self.recordings_list.pack(fill="x", padx=10)
+        self.controls_row = ttk.Frame(frame)
         self.repeat_label = ttk.Label(self.controls_row, text="Repeat count:")
         self.repeat_entry = ttk.Entry(self.controls_row, textvariable=self.repeat_count, width=5)
         repeat_help = ttk.Button(self.controls_row, text="?", width=2, command=lambda: self.show_field_help('repeat'))
@@ -324,9 +331,22 @@ class AutoStepApp(tk.Tk):
         self.delay_label.grid(row=0, column=3, padx=2)
         self.delay_entry.grid(row=0, column=4, padx=2)
         delay_help.grid(row=0, column=5, padx=2)
+        ttk.Label(self.controls_row, text="Backend:").grid(row=0, column=6, padx=2)
+        ttk.Combobox(self.controls_row, textvariable=self.backend_name, values=list(BACKENDS),
+                     state="readonly", width=9).grid(row=0, column=7, padx=2)
+        ttk.Label(self.controls_row, text="Speed:").grid(row=1, column=0, padx=2, pady=2)
+        ttk.Entry(self.controls_row, textvariable=self.speed, width=5).grid(row=1, column=1, padx=2)
+        ttk.Button(self.controls_row, text="?", width=2,
+                   command=lambda: self.show_field_help('speed')).grid(row=1, column=2, padx=2)
+        ttk.Label(self.controls_row, text="Max gap (sec):").grid(row=1, column=3, padx=2)
+        ttk.Entry(self.controls_row, textvariable=self.max_gap, width=5).grid(row=1, column=4, padx=2)
+        ttk.Checkbutton(self.controls_row, text="No delay",
+                        variable=self.no_delay).grid(row=1, column=6, columnspan=2, padx=2)
         self.controls_row.pack_forget()  # Hide initially
+        # Zoom into the timeline to play only that part
+        self.timeline = TimelineView(frame, height=80, on_range=self.timeline_range_changed)
         # Row for select custom, play button, and delete button
-        btn_row = ttk.Frame(self.main_frame)
+        btn_row = ttk.Frame(frame)
         btn_row.pack(fill="x", pady=5)
         select_icon = tk.PhotoImage(width=16, height=16)  # Placeholder icon
         select_btn = ttk.Button(btn_row, text="Select custom", image=select_icon, compound="left", command=self.select_playback_file)
@@ -339,66 +359,99 @@ class AutoStepApp(tk.Tk):
         self.delete_btn.pack(side="left", padx=5)
         self.delete_btn.pack_forget()  # Hide initially
         # Log area (smaller, scrollable)
-        log_frame = ttk.Frame(self.main_frame)
-        log_frame.pack(fill="x", padx=10, pady=2)
-        log_scroll = ttk.Scrollbar(log_frame, orient="vertical")
-        self.play_log = tk.Text(log_frame, height=4, state="disabled", yscrollcommand=log_scroll.set)
-        log_scroll.config(command=self.play_log.yview)
-        self.play_log.pack(side="left", fill="both", expand=True)
-        log_scroll.pack(side="right", fill="y")
+        self.list_log = LogView(frame, 'recordings')
+        self.list_log.pack(fill="x", padx=10, pady=2)
+        # Built once: the watcher keeps the catalog, and through it this list, current.
+        self.recordings_list.load(refresh=False)
+
+    def enter_playlist_screen(self, select_file=None):
+        self.unbind_all('<F9>')
+        self.unbind_all('<Escape>')
+        self.bind_all('<Escape>', lambda e: self.create_initial_screen())
+        self.play_log = self.list_log
         if select_file:
-            try:
-                idx = recordings.index(select_file)
-                self.recordings_listbox.selection_set(idx)
-                self.recordings_listbox.see(idx)
-                self.filename = os.path.join(RECORDINGS_FOLDER, select_file)
-                self.play_btn['state'] = 'normal'
-                self.controls_row.pack(pady=5)
-                self.log_play(f"Selected file: {select_file}")
-            except ValueError:
-                pass
+            self.recordings_list.select(select_file)
+        elif self.filename != self.selected_path():
+            # Recording in between reused self.filename; go back to the list's selection.
+            self.recording_selected(self.recordings_list.selected, announce=False)
+
+    def selected_path(self):
+        selected = self.recordings_list.selected
+        return os.path.join(RECORDINGS_FOLDER, selected) if selected else None
+
+    def playback_flow(self, select_file=None):
+        self.show_screen('playlist', select_file=select_file)
+
+    def index_recording(self, name):
+        self.catalog.update(name)
+        row = self.catalog.get(name)
+        if row is not None:
+            self.recording_changed(name, row)
+
+    def recording_changed(self, name, row):
+        # Called on the watcher thread; the list applies it on the Tk thread.
+        if self.recordings_list is not None:
+            self.recordings_list.post_change(name, row)
 
     def show_field_help(self, field):
         if field == 'repeat':
             messagebox.showinfo("Repeat Count", "Number of times to repeat playback. Must be a positive integer.")
         elif field == 'delay':
             messagebox.showinfo("Delay", "Delay in seconds between repeats. Must be a non-negative number.")
-
-    def recording_selected(self, event):
-        selection = self.recordings_listbox.curselection()
-        if not selection:
+        elif field == 'speed':
+            messagebox.showinfo("Speed", "Playback speed multiplier (2 = twice as fast). "
+                                "Max gap caps any idle pause between events; leave it blank for no cap. "
+                                "No delay fires events back to back. Key/button hold times and "
+                                "separate clicks are preserved in every mode.")
+
+    def recording_selected(self, fname, announce=True):
+        if not fname:
             self.filename = None
             self.play_btn['state'] = 'disabled'
             self.controls_row.pack_forget()
             self.delete_btn.pack_forget()
+            self.hide_timeline()
             return
-        fname = self.recordings_listbox.get(selection[0])
         self.filename = os.path.join(RECORDINGS_FOLDER, fname)
-        self.log_play(f"Selected file: {fname}")
+        if announce:
+            self.log_play(f"Selected file: {fname}")
         self.play_btn['state'] = 'normal'
         self.controls_row.pack_forget()
-        self.controls_row.pack(before=self.play_log.master, fill="x", pady=5)
+        self.controls_row.pack(before=self.list_log, fill="x", pady=5)
         self.delete_btn.pack(side="left", padx=5)
+        self.show_timeline(self.filename)
+
+    def show_timeline(self, path):
+        self.timeline.pack_forget()
+        self.timeline.pack(after=self.controls_row, fill="x", padx=10, pady=2)
+        self.timeline.load(lambda: shared_cache.load(path))
+
+    def hide_timeline(self):
+        self.timeline.clear()
+        self.timeline.pack_forget()
+        self.timeline_range_changed(None)
+
+    def timeline_range_changed(self, span):
+        if span is None:
+            self.play_btn.config(text="Play Recording")
+        else:
+            self.play_btn.config(text=f"Play {span[0]:.1f}s – {span[1]:.1f}s")
 
     def select_playback_file(self):
         file = filedialog.askopenfilename(initialdir=RECORDINGS_FOLDER,
-                                          filetypes=[("JSON Files", "*.json")],
+                                          filetypes=[("Recordings", "*.json *.jsonl *.asr")],
                                           title="Select Recording File")
         if file:
             fname = os.path.basename(file)
-            # Add to list if not present
-            if fname not in self.recordings_listbox.get(0, tk.END):
-                self.recordings_listbox.insert(tk.END, fname)
-            idx = self.recordings_listbox.get(0, tk.END).index(fname)
-            self.recordings_listbox.selection_clear(0, tk.END)
-            self.recordings_listbox.selection_set(idx)
-            self.recordings_listbox.see(idx)
+            # Highlight it if it is in the list; custom files elsewhere just clear the selection
+            self.recordings_list.set_selection(fname, notify=False)
             self.filename = file
             self.log_play(f"Selected file: {fname}")
             self.play_btn['state'] = 'normal'
             self.controls_row.pack_forget()
-            self.controls_row.pack(before=self.play_log.master, fill="x", pady=5)
+            self.controls_row.pack(before=self.list_log, fill="x", pady=5)
             self.delete_btn.pack_forget()  # Hide delete when custom
+            self.show_timeline(file)
 
     def play_selected_recording(self):
         if not self.filename:
@@ -415,147 +468,154 @@ class AutoStepApp(tk.Tk):
             messagebox.showerror(
                 "Input error", "Repeat count must be positive integer and delay must be non-negative number.")
             return
-        self.show_countdown(5, lambda: self.start_playback_ui(repeats, delay), on_cancel=self.playback_flow)
+        try:
+            max_gap = self.max_gap.get().strip()
+            warp = {'speed': float(self.speed.get()),
+                    'max_gap': float(max_gap) if max_gap else None,
+                    'no_delay': self.no_delay.get()}
+            if warp['speed'] <= 0 or (warp['max_gap'] is not None and warp['max_gap'] < 0):
+                raise ValueError
+        except Exception:
+            messagebox.showerror(
+                "Input error", "Speed must be a positive number and max gap a non-negative number or blank.")
+            return
+        backend_name = self.backend_name.get()
+        span = self.timeline.range()
+        self.show_countdown(5, lambda: self.start_playback_ui(repeats, delay, backend_name, warp, span),
+                            on_cancel=self.playback_flow)
 
-    def start_playback_ui(self, repeat_count, repeat_delay):
-        self.clear_frame()
+    def build_playing_screen(self, frame):
         # Top bar with back button
-        top_row = ttk.Frame(self.main_frame)
+        top_row = ttk.Frame(frame)
         top_row.pack(fill="x", pady=5)
-        back_btn = ttk.Button(top_row, text="←", command=self.playback_flow)
+        back_btn = ttk.Button(top_row, text="←", command=self.stop_playback)
         back_btn.pack(side="left", padx=5)
         # Controls: Pause/Resume, Stop
-        controls = ttk.Frame(self.main_frame)
+        controls = ttk.Frame(frame)
         controls.pack(pady=10)
-        self.playback_paused = False
-        self.pause_btn = ttk.Button(controls, text="Pause", command=self.toggle_playback_pause)
-        self.pause_btn.grid(row=0, column=0, padx=5)
+        self.playback_pause_btn = ttk.Button(controls, text="Pause", command=self.toggle_playback_pause)
+        self.playback_pause_btn.grid(row=0, column=0, padx=5)
         stop_btn = ttk.Button(controls, text="Stop", command=self.stop_playback)
         stop_btn.grid(row=0, column=1, padx=5)
         # Log area
-        log_frame = ttk.Frame(self.main_frame)
-        log_frame.pack(fill="x", padx=10, pady=2)
-        log_scroll = ttk.Scrollbar(log_frame, orient="vertical")
-        self.play_log = tk.Text(log_frame, height=4, state="disabled", yscrollcommand=log_scroll.set)
-        log_scroll.config(command=self.play_log.yview)
-        self.play_log.pack(side="left", fill="both", expand=True)
-        log_scroll.pack(side="right", fill="y")
+        self.run_log = LogView(frame, 'playback')
+        self.run_log.pack(fill="x", padx=10, pady=2)
+
+    def enter_playing_screen(self):
+        self.playback_control = PlaybackControl()
+        self.playback_pause_btn.config(text="Pause")
+        self.run_log.clear()
+        self.play_log = self.run_log
+
+    def start_playback_ui(self, repeat_count, repeat_delay, backend_name, warp, span=None):
+        self.show_screen('playing')
         # Start playback in thread
-        self._stop_playback = False
-        threading.Thread(target=self.playback, args=(repeat_count, repeat_delay), daemon=True).start()
+        threading.Thread(target=self.playback,
+                         args=(repeat_count, repeat_delay, backend_name, warp, span),
+                         daemon=True).start()
 
     def toggle_playback_pause(self):
-        self.playback_paused = not self.playback_paused
-        self.pause_btn.config(text="Resume" if self.playback_paused else "Pause")
-        self.log_play("⏸️ Paused playback." if self.playback_paused else "▶️ Resumed playback.")
+        paused = self.playback_control.toggle()
+        self.playback_pause_btn.config(text="Resume" if paused else "Pause")
+        self.log_play("⏸️ Paused playback." if paused else "▶️ Resumed playback.")
 
     def stop_playback(self):
-        self._stop_playback = True
+        self.playback_control.stop()
         self.log_play("⏹️ Playback stopped.")
-        self.after(500, self.playback_flow)
 
-    def playback(self, repeat_count, repeat_delay):
+    def playback(self, *args, **kwargs):
+        try:
+            self.play_recording(*args, **kwargs)
+        finally:
+            # Every way out, failures included, goes back to the list.
+            self.ui.call(self.after, 1000, self.playback_flow)
+
+    def play_recording(self, repeat_count, repeat_delay, backend_name, warp, span=None):
+        control = self.playback_control
         self.log_play(f"Playback starting...")
         try:
-            with open(self.filename, 'r') as f:
-                data = json.load(f)
+            recorded_w, recorded_h = read_screen_size(self.filename)
         except Exception as e:
             self.log_play(f"Error loading recording: {e}")
-            messagebox.showerror("Error", f"Could not load recording:\n{e}")
-            self.play_btn['state'] = 'disabled'
+            self.ui.call(messagebox.showerror, "Error", f"Could not load recording:\n{e}")
+            self.ui.call(self.play_btn.config, state='disabled')
             return
 
         current_w, current_h = pyautogui.size()
-        recorded_w = data.get('screen_width')
-        recorded_h = data.get('screen_height')
-        events = data.get('events', [])
 
         if (recorded_w, recorded_h) != (current_w, current_h):
             self.log_play(
                 f"⚠️ Resolution mismatch: Recorded {recorded_w}x{recorded_h}, Current {current_w}x{current_h}")
-            res = messagebox.askyesno("Resolution Mismatch",
-                                      "Screen resolution differs from recording. Continue playback?")
-            if not res:
+            res = self.ui.request(messagebox.askyesno, "Resolution Mismatch",
+                                  "Screen resolution differs from recording. Continue playback?")
+            if not res.result():
                 self.log_play("Playback cancelled by user.")
                 return
 
-        for i in range(repeat_count):
-            if self._stop_playback:
-                break
-            self.log_play(f"Playback iteration {i + 1} of {repeat_count}")
-            last_time = 0
-            for event in events:
-                if self._stop_playback:
-                    break
-                while self.playback_paused:
-                    time.sleep(0.1)
-                    if self._stop_playback:
-                        break
-                delay_time = event['time'] - last_time
-                time.sleep(delay_time)
-                last_time = event['time']
-
-                etype = event['type']
-                if etype == 'mouse_move':
-                    x = int(event['nx'] * current_w)
-                    y = int(event['ny'] * current_h)
-                    pyautogui.moveTo(x, y, duration=0)
-                elif etype == 'mouse_click':
-                    x = int(event['nx'] * current_w)
-                    y = int(event['ny'] * current_h)
-                    pyautogui.moveTo(x, y, duration=0)
-                    btn = event['button'].split('.')[-1]
-                    if event['pressed']:
-                        pyautogui.mouseDown(button=btn)
-                    else:
-                        pyautogui.mouseUp(button=btn)
-                elif etype == 'key_press':
-                    try:
-                        pyautogui.keyDown(event['key'])
-                    except Exception:
-                        pass
-                elif etype == 'key_release':
-                    try:
-                        pyautogui.keyUp(event['key'])
-                    except Exception:
-                        pass
-
-            if i < repeat_count - 1 and not self._stop_playback:
-                self.log_play(
-                    f"Waiting {repeat_delay} seconds before next repeat...")
-                for _ in range(int(repeat_delay * 10)):
-                    if self._stop_playback:
-                        break
-                    time.sleep(0.1)
-
-        if not self._stop_playback:
+        try:
+            backend = get_backend(backend_name)
+        except Exception as e:
+            self.log_play(f"Could not start backend '{backend_name}': {e}")
+            return
+        try:
+            if span:
+                plan = self.compile_range(span, (current_w, current_h), backend)
+            else:
+                plan = load_plan(self.filename, (current_w, current_h), backend)
+        except Exception as e:
+            backend.close()
+            self.log_play(f"Error loading recording: {e}")
+            return
+        if plan.from_cache:
+            self.log_play("📦 Using the cached plan.")
+        if plan.unresolved:
+            self.log_play(f"⚠️ Skipping keys that cannot be replayed: {plan.describe_unresolved()}")
+        plan = warp_plan(plan, **warp)
+        self.log_play(f"Timing: {describe_warp(**warp)}, {plan.describe_length()}")
+
+        if repeat_count > 1:
+            self.log_play(f"Repeating {repeat_count} times, {repeat_delay} seconds apart.")
+        scheduler = Scheduler()
+        try:
+            run_plan(plan, backend.handlers(), scheduler, repeat_count, repeat_delay, control,
+                     lambda i: self.log_play(f"Playback iteration {i + 1} of {repeat_count}"))
+        finally:
+            backend.close()
+        self.log_play(f"Timing: {scheduler.report()}")
+        if not control.stopped:
             self.log_play("Playback finished.")
-        self.after(1000, self.playback_flow)
+
+    def compile_range(self, span, size, backend):
+        start, end = span
+        track = shared_cache.load(self.filename)
+        self.log_play(f"Playing {start:.2f}s – {end:.2f}s of {track.duration:.2f}s only.")
+        # Keys or buttons held across the cut are released at its end.
+        part = track.between(start, end if end < track.duration else None).rebased().balanced()
+        return compile_plan(part, size, backend)
 
     def log_play(self, msg):
-        def update_log():
-            if hasattr(self, "play_log") and self.play_log.winfo_exists():
-                self.play_log.config(state="normal")
-                self.play_log.insert(tk.END, msg + "\n")
-                self.play_log.see(tk.END)
-                self.play_log.config(state="disabled")
-        self.after(0, update_log)
+        self.ui.write(self.write_play_log, msg)
+
+    def write_play_log(self, lines):
+        if self.play_log is not None:
+            self.play_log.append(lines)
 
     def delete_selected_recording(self):
-        selection = self.recordings_listbox.curselection()
-        if not selection:
+        fname = self.recordings_list.selected
+        if not fname:
             return
-        fname = self.recordings_listbox.get(selection[0])
         full_path = os.path.join(RECORDINGS_FOLDER, fname)
         if messagebox.askyesno("Delete Recording", f"Are you sure you want to delete '{fname}'?"):
             try:
                 os.remove(full_path)
-                self.recordings_listbox.delete(selection[0])
+                self.catalog.remove(fname)
+                self.recordings_list.remove(fname)
                 self.log_play(f"Deleted file: {fname}")
                 self.filename = None
                 self.play_btn['state'] = 'disabled'
                 self.controls_row.pack_forget()
                 self.delete_btn.pack_forget()
+                self.hide_timeline()
             except Exception as e:
                 messagebox.showerror("Error", f"Could not delete file:\n{e}")
 
@@ -4,10 +4,18 @@ import threading
 import time
 import json
 import os
+import sys
 import pyautogui
 from pynput import keyboard, mouse
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from autostep.catalog import Catalog  # noqa: E402
+from autostep.logview import LogView  # noqa: E402
+from autostep.recording import read_recording  # noqa: E402
+from autostep.schema import FORMAT_VERSION  # noqa: E402
+from autostep.uipump import UIPump  # noqa: E402
+
 RECORDINGS_FOLDER = "recordings"
 os.makedirs(RECORDINGS_FOLDER, exist_ok=True)
 
@@ -54,6 +62,9 @@ class AutoStepApp(tk.Tk):
         self.canvas.bind("<Configure>", lambda e: self.canvas.itemconfig(
             self.canvas_frame, width=e.width))
 
+        # Listener and playback threads only ever reach Tk through this pump.
+        self.ui = UIPump(self).start()
+
         self.create_menu()
         self.create_initial_screen()
 
@@ -128,8 +139,9 @@ class AutoStepApp(tk.Tk):
         self.recordings_listbox.bind(
             "<<ListboxSelect>>", self.recording_selected)
 
-        recordings = [f for f in os.listdir(
-            RECORDINGS_FOLDER) if f.endswith(".json") and os.path.exists(os.path.join(RECORDINGS_FOLDER, f))]
+        with Catalog(RECORDINGS_FOLDER) as catalog:
+            catalog.refresh()
+            recordings = [f for f in catalog.names() if f.endswith(".json")]
         self.recordings_listbox.delete(0, tk.END)  # Clear existing items
         for rec in recordings:
             self.recordings_listbox.insert(tk.END, rec)
@@ -162,8 +174,7 @@ class AutoStepApp(tk.Tk):
         self.play_btn.pack(pady=10)
         self.play_btn['state'] = 'disabled'
 
-        self.play_log = tk.Text(
-            self.main_frame, height=8, state="disabled")
+        self.play_log = LogView(self.main_frame, 'playback', height=8)
         self.play_log.pack(padx=10, pady=10, fill="both", expand=True)
 
         self.selected_playback_file = None
@@ -275,8 +286,7 @@ class AutoStepApp(tk.Tk):
                               command=self.back_to_main_from_recording)
         back_btn.pack(pady=5)
 
-        self.log_text = tk.Text(
-            self.main_frame, height=10, state="disabled")
+        self.log_text = LogView(self.main_frame, 'recording', height=10)
         self.log_text.pack(padx=10, pady=10, fill="x")
 
         threading.Thread(target=self.record, daemon=True).start()
@@ -298,10 +308,11 @@ class AutoStepApp(tk.Tk):
         self.start_recording_flow()
 
     def log(self, msg):
-        self.log_text.config(state="normal")
-        self.log_text.insert(tk.END, msg + "\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state="disabled")
+        self.ui.write(self.write_log, msg)
+
+    def write_log(self, lines):
+        if self.log_text.winfo_exists():
+            self.log_text.append(lines)
 
     def elapsed_time(self):
         return time.time() - self.start_time
@@ -320,8 +331,8 @@ class AutoStepApp(tk.Tk):
                 return False
             if key == keyboard.Key.f9:
                 self.paused = not self.paused
-                self.pause_btn.config(
-                    text="Resume" if self.paused else "Pause")
+                self.ui.call(self.pause_btn.config,
+                             text="Resume" if self.paused else "Pause")
                 self.log(
                     f"{'⏸️ Paused' if self.paused else '▶️ Resumed'} recording.")
                 return
@@ -353,7 +364,7 @@ class AutoStepApp(tk.Tk):
                 return
             self.events.append({'type': 'mouse_click', 'time': self.elapsed_time(),
                                 'nx': x / self.screen_width, 'ny': y / self.screen_height,
-                                'button': str(button), 'pressed': pressed})
+                                'button': button.name, 'pressed': pressed})
 
         mouse_listener = mouse.Listener(on_move=on_move, on_click=on_click)
         keyboard_listener = keyboard.Listener(
@@ -372,7 +383,9 @@ class AutoStepApp(tk.Tk):
 
         self.log("Recording stopped.")
         self.save_recording()
+        self.ui.call(self.recording_finished)
 
+    def recording_finished(self):
         # Show toast message and go to playback screen
         self.toast("Recording completed!")
         self.playback_flow()
@@ -384,6 +397,7 @@ class AutoStepApp(tk.Tk):
         meta = {
             'screen_width': self.screen_width,
             'screen_height': self.screen_height,
+            'format_version': FORMAT_VERSION,
             'events': self.events
         }
         try:
@@ -393,8 +407,8 @@ class AutoStepApp(tk.Tk):
                 f"Saved recording to: {os.path.basename(self.filename)}")
         except Exception as e:
             self.log(f"Error saving file: {e}")
-            messagebox.showerror(
-                "Error", f"Could not save recording:\n{e}")
+            self.ui.call(messagebox.showerror,
+                         "Error", f"Could not save recording:\n{e}")
 
     def toast(self, message, duration=2000):
         toast = tk.Toplevel(self)
@@ -454,31 +468,29 @@ class AutoStepApp(tk.Tk):
         # Only clear the log if the widget still exists
         try:
             if self.play_log.winfo_exists():
-                self.play_log.config(state="normal")
-                self.play_log.delete("1.0", tk.END)
-                self.play_log.config(state="disabled")
+                self.play_log.clear()
         except Exception:
             pass  # Widget does not exist, skip clearing
         threading.Thread(target=self.playback, args=(repeat_count, repeat_delay), daemon=True).start()
 
     def log_play(self, msg):
-        self.play_log.config(state="normal")
-        self.play_log.insert(tk.END, msg + "\n")
-        self.play_log.see(tk.END)
-        self.play_log.config(state="disabled")
+        self.ui.write(self.write_play_log, msg)
+
+    def write_play_log(self, lines):
+        if self.play_log.winfo_exists():
+            self.play_log.append(lines)
 
     def playback(self, repeat_count, repeat_delay):
         if not self.selected_playback_file or not os.path.exists(self.selected_playback_file):
             self.log_play("Error: No valid recording file selected.")
-            messagebox.showerror("Error", "No valid recording file selected.")
+            self.ui.call(messagebox.showerror, "Error", "No valid recording file selected.")
             return
 
         try:
-            with open(self.selected_playback_file, 'r') as f:
-                data = json.load(f)
+            data = read_recording(self.selected_playback_file, screen=pyautogui.size())
         except Exception as e:
             self.log_play(f"Error loading recording: {e}")
-            messagebox.showerror("Error", f"Failed to load recording: {e}")
+            self.ui.call(messagebox.showerror, "Error", f"Failed to load recording: {e}")
             return
 
         rec_screen_w = data.get('screen_width', 1280)
@@ -510,11 +522,10 @@ class AutoStepApp(tk.Tk):
                     x = int(event['nx'] * curr_w)
                     y = int(event['ny'] * curr_h)
                     pyautogui.moveTo(x, y, duration=0)
-                    btn = event['button'].split('.')[-1]
                     if event['pressed']:
-                        pyautogui.mouseDown(button=btn)
+                        pyautogui.mouseDown(button=event['button'])
                     else:
-                        pyautogui.mouseUp(button=btn)
+                        pyautogui.mouseUp(button=event['button'])
                 elif etype == 'key_press':
                     try:
                         pyautogui.keyDown(event['key'])